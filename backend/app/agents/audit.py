@@ -1,7 +1,5 @@
-import json
-import re
-from typing import Any, Dict, List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
 from enum import Enum
 
 from langchain.chat_models import ChatOpenAI
@@ -9,9 +7,109 @@ from langchain.schema import HumanMessage, SystemMessage
 
 from .base import BaseAgent, Tool
 from ..models.base import AgentResult, AgentType, Document
+from ..utils import json_fast
+from ..utils.llm_cache import get_llm_cache
+from ..utils.llm_stream import astream_json
 
 
-class AuditLevel(Enum):
+def _document_context(document: Document) -> Dict[str, Any]:
+    """Resolve the document fields used across an audit run in one place"""
+    doc_metadata = getattr(document, 'metadata', None) or {}
+    doc_type = getattr(document, 'doc_type', None)
+    return {
+        "id": getattr(document, 'id', 'unknown'),
+        "filename": getattr(document, 'filename', 'unknown'),
+        "uploaded_at": getattr(document, 'uploaded_at', None),
+        "doc_type": doc_type.value if doc_type else "unknown",
+        "metadata": doc_metadata,
+        "doc_metadata": json_fast.dumps(doc_metadata),
+        "content": document.content[:1000]
+    }
+
+
+def _build_user_prompt(task: str, doc_ctx: Dict[str, Any], sections: List[Tuple[str, str]]) -> str:
+    """Assemble an audit prompt from pre-serialized sections with a single join"""
+    parts = [task, " for ", doc_ctx["doc_type"], " document:"]
+    for title, body in sections:
+        parts += ["\n\n", title, ":\n", body]
+    parts += ["\n\nDOCUMENT METADATA:\n", doc_ctx["doc_metadata"], "\n\nDOCUMENT CONTENT (first 1000 chars):\n", doc_ctx["content"], "..."]
+    return "".join(parts)
+
+
+# Top-level fields each audit response must carry, checked before a result is used or cached
+_AUDIT_TRAIL_FIELDS = {"audit_events": list, "audit_summary": str, "compliance_status": str}
+_COMPLIANCE_REPORT_FIELDS = {"compliance_findings": list, "overall_compliance_score": (int, float)}
+_AUDIT_BUNDLE_FIELDS = {"audit_level": str, "regulatory_frameworks": list}
+_VALIDATION_REPORT_FIELDS = {"validation_checks": list, "overall_validation_score": (int, float)}
+
+
+def _validate_response(result: Any, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Check that a parsed LLM response has the expected top-level fields"""
+    if not isinstance(result, dict):
+        raise ValueError("LLM response is not a JSON object")
+    for key, expected_type in fields.items():
+        if not isinstance(result.get(key), expected_type):
+            raise ValueError(f"LLM response field '{key}' is missing or has the wrong type")
+    return result
+
+
+_STAGE_HISTORY_FIELDS = ("stage_id", "stage_name", "agent_type", "start_time", "end_time", "duration_seconds", "status", "error")
+_RUN_HISTORY_FIELDS = ("processing_id", "document_id", "goal", "start_time", "end_time", "duration", "status", "error")
+
+
+def _is_processing_run(entry: Dict) -> bool:
+    """Whether a history entry is an AgentService processing run rather than an orchestrator stage"""
+    return "processing_id" in entry or "orchestration_result" in entry
+
+
+def _compact_history(processing_history: List[Dict]) -> List[Dict]:
+    """Reduce processing history to the fields an audit trail needs.
+
+    Accepts both AgentService processing runs and orchestrator stage
+    records. Their results carry full agent outputs, which would otherwise
+    be embedded verbatim in the prompt; only their confidence and the start
+    of their rationale are kept.
+    """
+    compacted = []
+    for entry in processing_history:
+        if not isinstance(entry, dict):
+            compacted.append(entry)
+            continue
+        
+        if _is_processing_run(entry):
+            item = {key: entry[key] for key in _RUN_HISTORY_FIELDS if key in entry}
+            if entry.get("stages"):
+                item["stage_count"] = len(entry["stages"])
+            workflow_status = entry.get("workflow_status")
+            if isinstance(workflow_status, dict) and workflow_status.get("failed_stages"):
+                item["failed_stages"] = list(workflow_status["failed_stages"])
+            result = entry.get("orchestration_result")
+        else:
+            item = {key: entry[key] for key in _STAGE_HISTORY_FIELDS if key in entry}
+            result = entry.get("result")
+        
+        if isinstance(result, dict):
+            rationale, confidence = result.get("rationale"), result.get("confidence")
+        else:
+            rationale, confidence = getattr(result, "rationale", None), getattr(result, "confidence", None)
+        if rationale:
+            item["rationale"] = str(rationale)[:200]
+        if confidence is not None:
+            item["confidence"] = confidence
+        compacted.append(item)
+    return compacted
+
+
+def _shared_prompt_json(serialized: Optional[Dict[str, str]], name: str, data: Any) -> str:
+    """Serialize an artifact shared between tools at most once per audit run"""
+    if serialized is None:
+        return json_fast.dumps(data)
+    if name not in serialized:
+        serialized[name] = json_fast.dumps(data)
+    return serialized[name]
+
+
+class AuditLevel(str, Enum):
     """Audit level enumeration"""
     BASIC = "basic"
     STANDARD = "standard"
@@ -19,7 +117,17 @@ class AuditLevel(Enum):
     REGULATORY = "regulatory"
 
 
-class AuditType(Enum):
+def _parse_audit_level(value: Any) -> AuditLevel:
+    """Parse a requested audit level, falling back to standard for unknown values"""
+    if isinstance(value, AuditLevel):
+        return value
+    try:
+        return AuditLevel(str(value or AuditLevel.STANDARD.value).lower())
+    except ValueError:
+        return AuditLevel.STANDARD
+
+
+class AuditType(str, Enum):
     """Audit type enumeration"""
     COMPLIANCE = "compliance"
     RISK = "risk"
@@ -28,21 +136,7 @@ class AuditType(Enum):
     SECURITY = "security"
 
 
-class AuditTrailGeneratorTool(Tool):
-    """Tool for generating comprehensive audit trails"""
-    
-    def __init__(self):
-        super().__init__("generate_audit_trail", "Generate comprehensive audit trail")
-    
-    async def execute(self, document: Document, processing_history: List[Dict], **kwargs) -> Dict[str, Any]:
-        """Generate audit trail for document processing"""
-        try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
-            system_prompt = """You are an expert audit trail generator. Create a comprehensive audit trail for document processing.
+_AUDIT_TRAIL_SYSTEM_PROMPT = """You are an expert audit trail generator. Create a comprehensive audit trail for document processing.
             
             For each audit event, provide:
             - event_id: Unique event identifier
@@ -80,33 +174,46 @@ class AuditTrailGeneratorTool(Tool):
                 "recommendations": ["Continue monitoring", "Review access logs"]
             }
             """
+_AUDIT_TRAIL_SYSTEM_MESSAGE = SystemMessage(content=_AUDIT_TRAIL_SYSTEM_PROMPT)
+
+
+class AuditTrailGeneratorTool(Tool):
+    """Tool for generating comprehensive audit trails"""
+    
+    __slots__ = ("llm",)
+    
+    def __init__(self, llm: ChatOpenAI):
+        super().__init__("generate_audit_trail", "Generate comprehensive audit trail")
+        self.llm = llm
+    
+    async def execute(self, document: Document, processing_history: List[Dict], audit_level: AuditLevel = AuditLevel.STANDARD, serialized: Optional[Dict[str, str]] = None, doc_ctx: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        """Generate audit trail for document processing"""
+        try:
+            # Processing events are already structured; only regulatory audits need an LLM narrative
+            if audit_level != AuditLevel.REGULATORY:
+                return self._build_trail(doc_ctx or _document_context(document), processing_history)
             
             # Prepare processing history context
-            history_context = ""
+            sections = []
             if processing_history:
-                history_context = f"\n\nPROCESSING HISTORY:\n{json.dumps(processing_history, indent=2)}"
+                sections.append(("PROCESSING HISTORY", json_fast.dumps(processing_history)))
             
-            # Get document metadata
-            doc_metadata = document.metadata if hasattr(document, 'metadata') else {}
-            doc_type = document.doc_type.value if hasattr(document, 'doc_type') and document.doc_type else "unknown"
+            user_prompt = _build_user_prompt("Generate audit trail", doc_ctx or _document_context(document), sections)
             
-            user_prompt = f"Generate audit trail for {doc_type} document:{history_context}\n\nDOCUMENT METADATA:\n{json.dumps(doc_metadata, indent=2)}\n\nDOCUMENT CONTENT (first 1000 chars):\n{document.content[:1000]}..."
+            cache = get_llm_cache()
+            cache_key = cache.make_key(self.llm.model_name, _AUDIT_TRAIL_SYSTEM_PROMPT, user_prompt)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
             
             messages = [
-                SystemMessage(content=system_prompt),
+                _AUDIT_TRAIL_SYSTEM_MESSAGE,
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
-            
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
-            
-            return json.loads(result_text)
+            result = _validate_response(await astream_json(self.llm, messages), _AUDIT_TRAIL_FIELDS)
+            await cache.set(cache_key, result)
+            return result
             
         except Exception as e:
             return {
@@ -115,23 +222,97 @@ class AuditTrailGeneratorTool(Tool):
                 "compliance_status": "UNKNOWN",
                 "recommendations": ["Manual audit review required"]
             }
+    
+    def _build_trail(self, doc_ctx: Dict[str, Any], processing_history: List[Dict]) -> Dict[str, Any]:
+        """Build the audit trail directly from recorded processing runs or orchestrator stages"""
+        events = []
+        recommendations = []
+        
+        uploaded_at = doc_ctx["uploaded_at"]
+        if uploaded_at:
+            events.append({
+                "event_id": "evt_001",
+                "timestamp": uploaded_at.isoformat(),
+                "event_type": "document_upload",
+                "description": f"Document {doc_ctx['filename']} uploaded for processing",
+                "severity": "LOW",
+                "user": "system",
+                "system_component": "upload_service",
+                "metadata": {"document_id": str(doc_ctx["id"])},
+                "compliance_relevance": "Standard document processing"
+            })
+        
+        failed_stages = 0
+        for entry in processing_history:
+            if not isinstance(entry, dict):
+                continue
+            
+            if _is_processing_run(entry):
+                stage_name = f"Processing run {entry.get('processing_id') or 'unknown'}"
+                component = "orchestrator"
+                event_type = "document_processing"
+                duration = entry.get("duration")
+            else:
+                stage_name = entry.get("stage_name") or entry.get("agent_type") or "unknown"
+                component = entry.get("agent_type") or stage_name
+                event_type = f"{component}_processing"
+                duration = entry.get("duration_seconds")
+            status = str(entry.get("status") or "UNKNOWN").upper()
+            failed = status in ("FAILED", "ERROR")
+            confidence = entry.get("confidence")
+            
+            if failed:
+                failed_stages += 1
+                severity = "HIGH"
+                description = f"{stage_name} failed: {entry.get('error') or entry.get('rationale') or 'no result'}"
+                recommendations.append(f"Re-run {stage_name}")
+            elif confidence is not None and confidence < 0.5:
+                severity = "MEDIUM"
+                description = entry.get("rationale") or f"{stage_name} completed with low confidence"
+                recommendations.append(f"Review {stage_name} output (confidence {confidence:.2f})")
+            else:
+                severity = "LOW"
+                description = entry.get("rationale") or f"{stage_name} {status.lower()}"
+            if entry.get("failed_stages"):
+                recommendations.append(f"Review failed stages of {stage_name}: {', '.join(map(str, entry['failed_stages']))}")
+            
+            metadata = {"status": status, "duration_seconds": duration}
+            for key in ("stage_id", "processing_id", "goal"):
+                if entry.get(key) is not None:
+                    metadata[key] = entry[key]
+            event = {
+                "event_id": f"evt_{len(events) + 1:03d}",
+                "timestamp": entry.get("start_time") or entry.get("timestamp"),
+                "event_type": event_type,
+                "description": description,
+                "severity": severity,
+                "user": "system",
+                "system_component": component,
+                "metadata": metadata,
+                "compliance_relevance": "Processing failure affects audit completeness" if failed else "Standard document processing"
+            }
+            if confidence is not None:
+                event["confidence"] = confidence
+            events.append(event)
+        
+        stage_count = len(events) - (1 if uploaded_at else 0)
+        if not stage_count:
+            compliance_status = "UNKNOWN"
+            recommendations.append("No processing history recorded; manual audit review required")
+        elif failed_stages:
+            compliance_status = "REQUIRES_REVIEW"
+        else:
+            compliance_status = "COMPLIANT"
+        
+        return {
+            "audit_events": events,
+            "audit_summary": f"Audit trail built from {stage_count} processing records, {failed_stages} failed",
+            "compliance_status": compliance_status,
+            "recommendations": recommendations or ["Continue monitoring"]
+        }
 
 
-class ComplianceReportGeneratorTool(Tool):
-    """Tool for generating compliance reports"""
-    
-    def __init__(self):
-        super().__init__("generate_compliance_report", "Generate compliance report")
-    
-    async def execute(self, document: Document, risk_assessment: Dict, audit_trail: Dict, **kwargs) -> Dict[str, Any]:
-        """Generate compliance report"""
-        try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
-            system_prompt = """You are an expert compliance analyst. Generate a comprehensive compliance report.
+_COMPLIANCE_REPORT_SYSTEM_PROMPT = """You are an expert compliance analyst. Generate a comprehensive compliance report.
             
             For each compliance finding, provide:
             - finding_id: Unique finding identifier
@@ -171,34 +352,44 @@ class ComplianceReportGeneratorTool(Tool):
                 "next_steps": ["Continue monitoring", "Annual review"]
             }
             """
-            
+_COMPLIANCE_REPORT_SYSTEM_MESSAGE = SystemMessage(content=_COMPLIANCE_REPORT_SYSTEM_PROMPT)
+
+
+class ComplianceReportGeneratorTool(Tool):
+    """Tool for generating compliance reports"""
+    
+    __slots__ = ("llm",)
+    
+    def __init__(self, llm: ChatOpenAI):
+        super().__init__("generate_compliance_report", "Generate compliance report")
+        self.llm = llm
+    
+    async def execute(self, document: Document, risk_assessment: Dict, audit_trail: Dict, serialized: Optional[Dict[str, str]] = None, doc_ctx: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        """Generate compliance report"""
+        try:
             # Prepare context
-            context = ""
+            sections = []
             if risk_assessment:
-                context += f"\n\nRISK ASSESSMENT:\n{json.dumps(risk_assessment, indent=2)}"
+                sections.append(("RISK ASSESSMENT", _shared_prompt_json(serialized, 'risk_assessment', risk_assessment)))
             if audit_trail:
-                context += f"\n\nAUDIT TRAIL:\n{json.dumps(audit_trail, indent=2)}"
+                sections.append(("AUDIT TRAIL", _shared_prompt_json(serialized, 'audit_trail', audit_trail)))
             
-            doc_type = document.doc_type.value if hasattr(document, 'doc_type') and document.doc_type else "unknown"
-            doc_metadata = document.metadata if hasattr(document, 'metadata') else {}
+            user_prompt = _build_user_prompt("Generate compliance report", doc_ctx or _document_context(document), sections)
             
-            user_prompt = f"Generate compliance report for {doc_type} document:{context}\n\nDOCUMENT METADATA:\n{json.dumps(doc_metadata, indent=2)}\n\nDOCUMENT CONTENT (first 1000 chars):\n{document.content[:1000]}..."
+            cache = get_llm_cache()
+            cache_key = cache.make_key(self.llm.model_name, _COMPLIANCE_REPORT_SYSTEM_PROMPT, user_prompt)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
             
             messages = [
-                SystemMessage(content=system_prompt),
+                _COMPLIANCE_REPORT_SYSTEM_MESSAGE,
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
-            
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
-            
-            return json.loads(result_text)
+            result = _validate_response(await astream_json(self.llm, messages), _COMPLIANCE_REPORT_FIELDS)
+            await cache.set(cache_key, result)
+            return result
             
         except Exception as e:
             return {
@@ -210,21 +401,7 @@ class ComplianceReportGeneratorTool(Tool):
             }
 
 
-class AuditBundleGeneratorTool(Tool):
-    """Tool for generating audit bundles"""
-    
-    def __init__(self):
-        super().__init__("generate_audit_bundle", "Generate audit bundle")
-    
-    async def execute(self, document: Document, audit_trail: Dict, compliance_report: Dict, risk_assessment: Dict, **kwargs) -> Dict[str, Any]:
-        """Generate comprehensive audit bundle"""
-        try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
-            system_prompt = """You are an expert audit bundle generator. Create a comprehensive audit bundle for regulatory compliance.
+_AUDIT_BUNDLE_SYSTEM_PROMPT = """You are an expert audit bundle generator. Create a comprehensive audit bundle for regulatory compliance.
             
             The audit bundle should include:
             - executive_summary: High-level summary
@@ -260,41 +437,52 @@ class AuditBundleGeneratorTool(Tool):
                 "appendices": ["Appendix A", "Appendix B"]
             }
             """
-            
+_AUDIT_BUNDLE_SYSTEM_MESSAGE = SystemMessage(content=_AUDIT_BUNDLE_SYSTEM_PROMPT)
+
+
+class AuditBundleGeneratorTool(Tool):
+    """Tool for generating audit bundles"""
+    
+    __slots__ = ("llm",)
+    
+    def __init__(self, llm: ChatOpenAI):
+        super().__init__("generate_audit_bundle", "Generate audit bundle")
+        self.llm = llm
+    
+    async def execute(self, document: Document, audit_trail: Dict, compliance_report: Dict, risk_assessment: Dict, serialized: Optional[Dict[str, str]] = None, doc_ctx: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        """Generate comprehensive audit bundle"""
+        try:
             # Prepare comprehensive context
-            context = ""
+            sections = []
             if audit_trail:
-                context += f"\n\nAUDIT TRAIL:\n{json.dumps(audit_trail, indent=2)}"
+                sections.append(("AUDIT TRAIL", _shared_prompt_json(serialized, 'audit_trail', audit_trail)))
             if compliance_report:
-                context += f"\n\nCOMPLIANCE REPORT:\n{json.dumps(compliance_report, indent=2)}"
+                sections.append(("COMPLIANCE REPORT", _shared_prompt_json(serialized, 'compliance_report', compliance_report)))
             if risk_assessment:
-                context += f"\n\nRISK ASSESSMENT:\n{json.dumps(risk_assessment, indent=2)}"
+                sections.append(("RISK ASSESSMENT", _shared_prompt_json(serialized, 'risk_assessment', risk_assessment)))
             
-            doc_type = document.doc_type.value if hasattr(document, 'doc_type') and document.doc_type else "unknown"
-            doc_metadata = document.metadata if hasattr(document, 'metadata') else {}
+            user_prompt = _build_user_prompt("Generate audit bundle", doc_ctx or _document_context(document), sections)
             
-            user_prompt = f"Generate audit bundle for {doc_type} document:{context}\n\nDOCUMENT METADATA:\n{json.dumps(doc_metadata, indent=2)}\n\nDOCUMENT CONTENT (first 1000 chars):\n{document.content[:1000]}..."
+            cache = get_llm_cache()
+            cache_key = cache.make_key(self.llm.model_name, _AUDIT_BUNDLE_SYSTEM_PROMPT, user_prompt)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
             
             messages = [
-                SystemMessage(content=system_prompt),
+                _AUDIT_BUNDLE_SYSTEM_MESSAGE,
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
-            
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
-            
-            return json.loads(result_text)
+            result = _validate_response(await astream_json(self.llm, messages), _AUDIT_BUNDLE_FIELDS)
+            await cache.set(cache_key, result)
+            return result
             
         except Exception as e:
+            now = datetime.now(timezone.utc)
             return {
-                "bundle_id": f"audit_bundle_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
-                "created_at": datetime.utcnow().isoformat(),
+                "bundle_id": f"audit_bundle_{now.strftime('%Y%m%d_%H%M%S')}",
+                "created_at": now.isoformat(),
                 "valid_until": "2024-12-31T23:59:59Z",
                 "regulatory_frameworks": [],
                 "audit_level": "BASIC",
@@ -309,21 +497,7 @@ class AuditBundleGeneratorTool(Tool):
             }
 
 
-class ValidationReportGeneratorTool(Tool):
-    """Tool for generating validation reports"""
-    
-    def __init__(self):
-        super().__init__("generate_validation_report", "Generate validation report")
-    
-    async def execute(self, audit_bundle: Dict, **kwargs) -> Dict[str, Any]:
-        """Generate validation report for audit bundle"""
-        try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
-            system_prompt = """You are an expert audit validator. Generate a validation report for an audit bundle.
+_VALIDATION_REPORT_SYSTEM_PROMPT = """You are an expert audit validator. Generate a validation report for an audit bundle.
             
             For each validation check, provide:
             - check_id: Unique check identifier
@@ -361,24 +535,37 @@ class ValidationReportGeneratorTool(Tool):
                 "regulatory_acceptance": "LIKELY"
             }
             """
+_VALIDATION_REPORT_SYSTEM_MESSAGE = SystemMessage(content=_VALIDATION_REPORT_SYSTEM_PROMPT)
+
+
+class ValidationReportGeneratorTool(Tool):
+    """Tool for generating validation reports"""
+    
+    __slots__ = ("llm",)
+    
+    def __init__(self, llm: ChatOpenAI):
+        super().__init__("generate_validation_report", "Generate validation report")
+        self.llm = llm
+    
+    async def execute(self, audit_bundle: Dict, **kwargs) -> Dict[str, Any]:
+        """Generate validation report for audit bundle"""
+        try:
+            user_prompt = f"Validate this audit bundle:\n\nAUDIT BUNDLE:\n{json_fast.dumps(audit_bundle)}"
             
-            user_prompt = f"Validate this audit bundle:\n\nAUDIT BUNDLE:\n{json.dumps(audit_bundle, indent=2)}"
+            cache = get_llm_cache()
+            cache_key = cache.make_key(self.llm.model_name, _VALIDATION_REPORT_SYSTEM_PROMPT, user_prompt)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
             
             messages = [
-                SystemMessage(content=system_prompt),
+                _VALIDATION_REPORT_SYSTEM_MESSAGE,
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
-            
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
-            
-            return json.loads(result_text)
+            result = _validate_response(await astream_json(self.llm, messages), _VALIDATION_REPORT_FIELDS)
+            await cache.set(cache_key, result)
+            return result
             
         except Exception as e:
             return {
@@ -393,15 +580,17 @@ class ValidationReportGeneratorTool(Tool):
 class AuditAgent(BaseAgent):
     """Agent responsible for audit trail generation and compliance reporting"""
     
+    __slots__ = ("llm",)
+    
     def __init__(self, llm_model: str = "gpt-4"):
         super().__init__("AuditAgent", AgentType.AUDIT)
-        self.llm = ChatOpenAI(model=llm_model, temperature=0.1)
+        self.llm = ChatOpenAI(model=llm_model, temperature=0.1, max_retries=0)
         
         # Add tools
-        self.add_tool(AuditTrailGeneratorTool())
-        self.add_tool(ComplianceReportGeneratorTool())
-        self.add_tool(AuditBundleGeneratorTool())
-        self.add_tool(ValidationReportGeneratorTool())
+        self.add_tool(AuditTrailGeneratorTool(self.llm))
+        self.add_tool(ComplianceReportGeneratorTool(self.llm))
+        self.add_tool(AuditBundleGeneratorTool(self.llm))
+        self.add_tool(ValidationReportGeneratorTool(self.llm))
     
     async def run(self, goal: str, context: Dict[str, Any]) -> AgentResult:
         """Main audit process"""
@@ -416,14 +605,24 @@ class AuditAgent(BaseAgent):
         
         try:
             # Get processing history and assessments
-            processing_history = context.get("processing_history", [])
-            risk_assessment = document.metadata.get("risk_assessment", {}) if hasattr(document, 'metadata') else {}
+            # Orchestrated runs have no service history; fall back to the stages recorded so far
+            processing_history = context.get("processing_history") or (context.get("workflow_state") or {}).get("execution_history", [])
+            processing_history = _compact_history(processing_history)
+            audit_level = _parse_audit_level(context.get("audit_level"))
+            doc_ctx = _document_context(document)
+            risk_assessment = doc_ctx["metadata"].get("risk_assessment", {})
+            
+            # Artifacts reused across prompts are serialized once per run
+            serialized: Dict[str, str] = {}
             
             # Generate audit trail
             audit_trail_tool = self.get_tool("generate_audit_trail")
             audit_trail = await audit_trail_tool.execute(
                 document=document,
-                processing_history=processing_history
+                processing_history=processing_history,
+                audit_level=audit_level,
+                serialized=serialized,
+                doc_ctx=doc_ctx
             )
             
             # Generate compliance report
@@ -431,7 +630,9 @@ class AuditAgent(BaseAgent):
             compliance_report = await compliance_tool.execute(
                 document=document,
                 risk_assessment=risk_assessment,
-                audit_trail=audit_trail
+                audit_trail=audit_trail,
+                serialized=serialized,
+                doc_ctx=doc_ctx
             )
             
             # Generate audit bundle
@@ -440,7 +641,9 @@ class AuditAgent(BaseAgent):
                 document=document,
                 audit_trail=audit_trail,
                 compliance_report=compliance_report,
-                risk_assessment=risk_assessment
+                risk_assessment=risk_assessment,
+                serialized=serialized,
+                doc_ctx=doc_ctx
             )
             
             # Generate validation report
@@ -450,12 +653,13 @@ class AuditAgent(BaseAgent):
             )
             
             # Create comprehensive audit result
+            audited_at = datetime.now(timezone.utc)
             audit_result = {
-                "audit_id": f"audit_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+                "audit_id": f"audit_{audited_at.strftime('%Y%m%d_%H%M%S')}",
                 "document_info": {
-                    "id": getattr(document, 'id', 'unknown'),
-                    "type": document.doc_type.value if hasattr(document, 'doc_type') and document.doc_type else "unknown",
-                    "filename": getattr(document, 'filename', 'unknown')
+                    "id": doc_ctx["id"],
+                    "type": doc_ctx["doc_type"],
+                    "filename": doc_ctx["filename"]
                 },
                 "audit_components": {
                     "audit_trail": audit_trail,
@@ -464,7 +668,7 @@ class AuditAgent(BaseAgent):
                     "validation_report": validation_report
                 },
                 "audit_metadata": {
-                    "audited_at": datetime.utcnow().isoformat(),
+                    "audited_at": audited_at.isoformat(),
                     "audit_level": audit_bundle.get("audit_level", "STANDARD"),
                     "regulatory_frameworks": audit_bundle.get("regulatory_frameworks", []),
                     "compliance_score": compliance_report.get("overall_compliance_score", 0.0),
@@ -515,9 +719,10 @@ class AuditAgent(BaseAgent):
         
         # Audit trail confidence
         audit_events = audit_trail.get("audit_events", [])
-        if audit_events:
-            avg_event_confidence = sum(event.get("confidence", 0.5) for event in audit_events if "confidence" in event) / len(audit_events)
-            confidence += avg_event_confidence * 0.2
+        event_confidences = [event["confidence"] for event in audit_events if "confidence" in event]
+        if event_confidences:
+            # Events without a confidence still count towards the average
+            confidence += sum(event_confidences) / len(audit_events) * 0.2
         
         # Compliance report confidence
         compliance_score = compliance_report.get("overall_compliance_score", 0.0)
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
@@ -8,6 +9,8 @@ from ..models.base import AgentResult, AgentType
 class Tool:
     """Base class for agent tools"""
     
+    __slots__ = ("name", "description")
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -21,22 +24,38 @@ class Tool:
 class BaseAgent(ABC):
     """Base class for all agents in the system"""
     
+    __slots__ = ("name", "agent_type", "_tools", "confidence_threshold", "_tools_by_name")
+    
     def __init__(self, name: str, agent_type: AgentType):
         self.name = name
         self.agent_type = agent_type
         self.tools: List[Tool] = []
         self.confidence_threshold = 0.7
+    
+    @property
+    def tools(self):
+        """The agent's toolkit"""
+        return self._tools
+    
+    @tools.setter
+    def tools(self, tools):
+        """Replace the toolkit, either a list of tools or a mapping of name to tool"""
+        self._tools = tools
+        if isinstance(tools, dict):
+            self._tools_by_name = dict(tools)
+        else:
+            self._tools_by_name = {}
+            for tool in tools:
+                self._tools_by_name.setdefault(tool.name, tool)
         
     def add_tool(self, tool: Tool):
         """Add a tool to the agent's toolkit"""
         self.tools.append(tool)
+        self._tools_by_name.setdefault(tool.name, tool)
     
     def get_tool(self, tool_name: str) -> Optional[Tool]:
         """Get a tool by name"""
-        for tool in self.tools:
-            if tool.name == tool_name:
-                return tool
-        return None
+        return self._tools_by_name.get(tool_name)
     
     @abstractmethod
     async def run(self, goal: str, context: Dict[str, Any]) -> AgentResult:
@@ -52,17 +71,34 @@ class BaseAgent(ABC):
         """
         pass
     
+    async def run_batch(self, goal: str, contexts: List[Dict[str, Any]]) -> List[AgentResult]:
+        """Run the agent over several contexts concurrently.
+        
+        Agent runs are dominated by LLM round-trips, so contexts are processed
+        in parallel, bounded by AGENT_CONCURRENT_LIMIT to stay within provider
+        rate limits. Results are returned in input order.
+        """
+        from ..core.config import settings
+        
+        semaphore = asyncio.Semaphore(settings.AGENT_CONCURRENT_LIMIT)
+        
+        async def run_one(context: Dict[str, Any]) -> AgentResult:
+            async with semaphore:
+                return await self.run(goal, context)
+        
+        return list(await asyncio.gather(*(run_one(context) for context in contexts)))
+    
     async def execute_with_timing(self, goal: str, context: Dict[str, Any]) -> AgentResult:
         """Execute agent with timing information"""
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
         try:
             result = await self.run(goal, context)
-            duration_ms = int((time.time() - start_time) * 1000)
+            duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
             result.duration_ms = duration_ms
             return result
         except Exception as e:
-            duration_ms = int((time.time() - start_time) * 1000)
+            duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
             return AgentResult(
                 output=None,
                 rationale=f"Error in {self.name}: {str(e)}",
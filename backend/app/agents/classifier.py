@@ -1,5 +1,7 @@
-import json
-from typing import Any, Dict, List, Optional
+import asyncio
+import re
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from langchain.chat_models import ChatOpenAI
@@ -7,23 +9,156 @@ from langchain.schema import HumanMessage, SystemMessage
 
 from .base import BaseAgent, Tool
 from ..models.base import AgentResult, AgentType, Document, DocumentType
+from ..utils.llm_stream import astream_json
+from ..utils.semantic_cache import get_semantic_cache
+from ..utils.tokens import truncate_to_tokens
 
 
-class DocumentClassificationTool(Tool):
-    """Tool for classifying documents using LLM"""
+# Numeric, ISO and written-out dates, applied in this order
+_DATE_PATTERNS = (
+    re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}'),
+    re.compile(r'\d{4}-\d{2}-\d{2}'),
+    re.compile(r'\w+ \d{1,2},? \d{4}')
+)
+_NUMBERED_SECTION_RE = re.compile(r'^[^\S\n]*\d+\.', re.MULTILINE)
+# Lines without ASCII lowercase letters; the only lines that can be all-caps headers
+_HEADER_CANDIDATE_RE = re.compile(r'^[^a-z\n]+$', re.MULTILINE)
+_DIGIT_RE = re.compile(r'\d')
+
+# Document excerpt size sent for classification, roughly the previous 2000 characters
+_CLASSIFICATION_MAX_TOKENS = 500
+
+_LEGAL_TERMS = (
+    "contract", "agreement", "terms", "conditions", "liability",
+    "jurisdiction", "governing law", "party", "breach", "termination",
+    "amendment", "warranty", "indemnification", "force majeure"
+)
+
+_FINANCIAL_TERMS = (
+    "payment", "amount", "currency", "invoice", "balance",
+    "total", "due", "account", "transaction", "fee",
+    "price", "cost", "revenue", "expense", "budget"
+)
+
+
+def _compile_terms(terms: Tuple[str, ...]) -> re.Pattern:
+    """Compile a vocabulary into one pattern that finds every term in a single scan.
     
-    def __init__(self):
-        super().__init__("classify", "Classify document type and domain using LLM")
+    The lookahead matches at each position without consuming text, so terms
+    overlapping one another are all found, as with a substring test. No term
+    may be a prefix of another, since only one can match at a given position.
+    """
+    return re.compile("(?=(" + "|".join(map(re.escape, terms)) + "))")
+
+
+_LEGAL_TERMS_RE = _compile_terms(_LEGAL_TERMS)
+_FINANCIAL_TERMS_RE = _compile_terms(_FINANCIAL_TERMS)
+
+
+def _find_terms(pattern: re.Pattern, terms: Tuple[str, ...], content_lower: str) -> List[str]:
+    """Return the terms present in the content, in vocabulary order"""
+    found = set()
+    for match in pattern.finditer(content_lower):
+        found.add(match.group(1))
+        if len(found) == len(terms):
+            break
+    return [term for term in terms if term in found]
+
+
+def _count_headers(content: str) -> int:
+    """Count short all-caps lines, scanning only lines that can be headers"""
+    header_count = 0
+    for match in _HEADER_CANDIDATE_RE.finditer(content):
+        line = match.group(0).strip()
+        if len(line) < 100 and line.isupper():
+            header_count += 1
+    return header_count
+
+
+def _count_numbered_sections(content: str) -> int:
+    """Count lines starting with a section number, ignoring indentation"""
+    return sum(1 for _ in _NUMBERED_SECTION_RE.finditer(content))
+
+
+# Phrases that identify a document type on their own, checked in the document header
+_TYPE_ANCHORS = {
+    "invoice": (r"invoice\s*(?:#|no\.|number)", r"balance due", r"amount due", r"bill to"),
+    "contract": (r"this agreement", r"whereas", r"in witness whereof", r"by and between"),
+    "insurance_policy": (r"policy (?:number|no\.)", r"policyholder", r"named insured"),
+    "medical_record": (r"patient name", r"medical record number", r"chief complaint"),
+    "financial_statement": (r"balance sheet", r"income statement", r"statement of cash flows")
+}
+
+_TYPE_DOMAINS = {
+    "invoice": "financial",
+    "contract": "legal",
+    "insurance_policy": "insurance",
+    "medical_record": "healthcare",
+    "financial_statement": "financial"
+}
+
+_ANCHOR_RE = re.compile(
+    "|".join(f"(?P<{doc_type}>" + "|".join(rf"\b{anchor}" for anchor in anchors) + ")" for doc_type, anchors in _TYPE_ANCHORS.items()),
+    re.IGNORECASE
+)
+
+# Header length scanned for anchors and the distinct anchors needed to skip the LLM
+_ANCHOR_SCAN_CHARS = 500
+_ANCHOR_MIN_MATCHES = 2
+
+
+def _keyword_classification(content: str) -> Optional[Dict[str, Any]]:
+    """Classify unambiguous documents from anchor phrases in their header.
     
-    async def execute(self, content: str, **kwargs) -> Dict[str, Any]:
-        """Classify document content"""
-        try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
-            system_prompt = """You are an expert document classifier for regulatory and business documents. 
+    Returns None unless the anchors of exactly one type fire, at least
+    _ANCHOR_MIN_MATCHES distinct ones, so ambiguous documents go to the LLM.
+    """
+    matches: Dict[str, set] = {}
+    for match in _ANCHOR_RE.finditer(content[:_ANCHOR_SCAN_CHARS]):
+        matches.setdefault(match.lastgroup, set()).add(match.group(0).lower())
+    
+    if len(matches) != 1:
+        return None
+    doc_type, indicators = next(iter(matches.items()))
+    if len(indicators) < _ANCHOR_MIN_MATCHES:
+        return None
+    
+    return {
+        "document_type": doc_type,
+        "domain": _TYPE_DOMAINS[doc_type],
+        "confidence": 0.95,
+        "reasoning": f"Document header contains {doc_type} anchor phrases",
+        "key_indicators": sorted(indicators),
+        "model": "keyword_anchors"
+    }
+
+
+_DOCUMENT_TYPE_VALUES = frozenset(doc_type.value for doc_type in DocumentType)
+
+
+def _validate_classification(result: Any) -> Dict[str, Any]:
+    """Check that a classification names a known document type with a confidence in [0, 1].
+    
+    Results are cached for near-duplicate documents, so anything
+    ClassifierAgent.run cannot consume is rejected before it is stored.
+    """
+    if not isinstance(result, dict):
+        raise ValueError(f"Expected a JSON object, got {type(result).__name__}")
+    if result.get("document_type") not in _DOCUMENT_TYPE_VALUES:
+        raise ValueError(f"Unknown document type: {result.get('document_type')!r}")
+    confidence = result.get("confidence")
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0.0 <= confidence <= 1.0:
+        raise ValueError(f"Confidence must be a number in [0, 1], got {confidence!r}")
+    for field in ("domain", "reasoning"):
+        if not isinstance(result.get(field), str):
+            raise ValueError(f"Response field '{field}' must be a string")
+    result["confidence"] = float(confidence)
+    return result
+
+
+# Built once at import rather than per request; everything document-specific
+# goes in the human message after it
+_CLASSIFICATION_SYSTEM_PROMPT = """You are an expert document classifier for regulatory and business documents. 
             Analyze the document content and classify it into one of the following types:
             
             - contract: Legal agreements, contracts, terms of service
@@ -48,24 +183,61 @@ class DocumentClassificationTool(Tool):
                 "key_indicators": ["indicator1", "indicator2"]
             }
             """
+_CLASSIFICATION_SYSTEM_MESSAGE = SystemMessage(content=_CLASSIFICATION_SYSTEM_PROMPT)
+
+
+class DocumentClassificationTool(Tool):
+    """Tool for classifying documents using LLM"""
+    
+    def __init__(self, llm: ChatOpenAI, fallback_llm: Optional[ChatOpenAI] = None, escalation_threshold: float = 0.7):
+        super().__init__("classify", "Classify document type and domain using LLM")
+        self.llm = llm
+        self.fallback_llm = fallback_llm
+        self.escalation_threshold = escalation_threshold
+    
+    async def execute(self, content: str, **kwargs) -> Dict[str, Any]:
+        """Classify document content"""
+        try:
+            # Unambiguous documents are classified without an LLM call
+            keyword_result = _keyword_classification(content)
+            if keyword_result is not None:
+                return keyword_result
             
-            user_prompt = f"Classify this document content:\n\n{content[:2000]}..."
+            # Budget the excerpt in tokens, which is what the prompt is billed and limited by
+            excerpt = await truncate_to_tokens(content, _CLASSIFICATION_MAX_TOKENS, self.llm.model_name)
+            
+            # Near-duplicate documents reuse an earlier classification
+            cache = get_semantic_cache("classification")
+            embedding = await cache.embed(excerpt)
+            cached = cache.get(embedding)
+            if cached is not None:
+                # The stored result describes a near-identical document, not this one
+                cached["cached"] = True
+                cached["reasoning"] = f"Reused classification of a near-identical document. {cached.get('reasoning', '')}".strip()
+                return cached
+            
+            user_prompt = f"Classify this document content:\n\n{excerpt}..."
             
             messages = [
-                SystemMessage(content=system_prompt),
+                _CLASSIFICATION_SYSTEM_MESSAGE,
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
+            result, model_name = None, self.llm.model_name
+            try:
+                result = await astream_json(self.llm, messages)
+            except Exception:
+                if self.fallback_llm is None:
+                    raise
             
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
+            # Escalate to the fallback model when the primary fails or is unsure
+            if self.fallback_llm is not None and not self._is_confident(result):
+                result = await astream_json(self.fallback_llm, messages)
+                model_name = self.fallback_llm.model_name
             
-            result = json.loads(result_text)
+            result = _validate_classification(result)
+            result["model"] = model_name
+            cache.set(embedding, result)
             return result
             
         except Exception as e:
@@ -76,6 +248,14 @@ class DocumentClassificationTool(Tool):
                 "reasoning": f"Classification failed: {str(e)}",
                 "key_indicators": []
             }
+    
+    def _is_confident(self, result: Any) -> bool:
+        """Check whether a classification is confident enough to skip escalation"""
+        try:
+            _validate_classification(result)
+        except ValueError:
+            return False
+        return result["confidence"] >= self.escalation_threshold
 
 
 class ContentAnalysisTool(Tool):
@@ -86,82 +266,58 @@ class ContentAnalysisTool(Tool):
     
     async def execute(self, content: str, **kwargs) -> Dict[str, Any]:
         """Analyze content structure"""
-        import re
+        # The analysis is CPU-bound, so keep it off the event loop
+        return await asyncio.to_thread(self._analyze, content)
+    
+    def _analyze(self, content: str) -> Dict[str, Any]:
+        """Compute structural statistics for the content"""
+        # Split and lowercase once and share the results with the helpers
+        content_lower = content.lower()
+        paragraph_count = sum(1 for p in content.split('\n\n') if p.strip())
+        
         analysis = {
             "word_count": len(content.split()),
             "character_count": len(content),
-            "paragraph_count": len([p for p in content.split('\n\n') if p.strip()]),
-            "has_numbers": any(char.isdigit() for char in content),
+            "paragraph_count": paragraph_count,
+            "has_numbers": _DIGIT_RE.search(content) is not None,
             "has_dates": self._extract_dates(content),
-            "has_legal_terms": self._check_legal_terms(content),
-            "has_financial_terms": self._check_financial_terms(content),
-            "structure_score": self._calculate_structure_score(content)
+            "has_legal_terms": self._check_legal_terms(content_lower),
+            "has_financial_terms": self._check_financial_terms(content_lower),
+            "structure_score": self._calculate_structure_score(content, paragraph_count)
         }
         
         return analysis
     
     def _extract_dates(self, content: str) -> List[str]:
         """Extract dates from content"""
-        date_patterns = [
-            r'\d{1,2}/\d{1,2}/\d{2,4}',
-            r'\d{4}-\d{2}-\d{2}',
-            r'\w+ \d{1,2},? \d{4}'
-        ]
-        
+        # Stop scanning once the first 5 dates are found
         dates = []
-        for pattern in date_patterns:
-            dates.extend(re.findall(pattern, content))
-        
-        return dates[:5]  # Limit to first 5 dates
+        for pattern in _DATE_PATTERNS:
+            dates.extend(match.group(0) for match in islice(pattern.finditer(content), 5 - len(dates)))
+            if len(dates) == 5:
+                break
+        return dates
     
-    def _check_legal_terms(self, content: str) -> List[str]:
-        """Check for legal terms"""
-        legal_terms = [
-            "contract", "agreement", "terms", "conditions", "liability",
-            "jurisdiction", "governing law", "party", "breach", "termination",
-            "amendment", "warranty", "indemnification", "force majeure"
-        ]
-        
-        found_terms = []
-        content_lower = content.lower()
-        for term in legal_terms:
-            if term in content_lower:
-                found_terms.append(term)
-        
-        return found_terms
+    def _check_legal_terms(self, content_lower: str) -> List[str]:
+        """Check lowercased content for legal terms"""
+        return _find_terms(_LEGAL_TERMS_RE, _LEGAL_TERMS, content_lower)
     
-    def _check_financial_terms(self, content: str) -> List[str]:
-        """Check for financial terms"""
-        financial_terms = [
-            "payment", "amount", "currency", "invoice", "balance",
-            "total", "due", "account", "transaction", "fee",
-            "price", "cost", "revenue", "expense", "budget"
-        ]
-        
-        found_terms = []
-        content_lower = content.lower()
-        for term in financial_terms:
-            if term in content_lower:
-                found_terms.append(term)
-        
-        return found_terms
+    def _check_financial_terms(self, content_lower: str) -> List[str]:
+        """Check lowercased content for financial terms"""
+        return _find_terms(_FINANCIAL_TERMS_RE, _FINANCIAL_TERMS, content_lower)
     
-    def _calculate_structure_score(self, content: str) -> float:
+    def _calculate_structure_score(self, content: str, paragraph_count: int) -> float:
         """Calculate document structure score"""
         score = 0.0
         
         # Check for headers
-        lines = content.split('\n')
-        header_count = sum(1 for line in lines if line.strip().isupper() and len(line.strip()) < 100)
-        score += min(0.3, header_count * 0.1)
+        score += min(0.3, _count_headers(content) * 0.1)
         
         # Check for numbered sections
-        numbered_sections = sum(1 for line in lines if re.match(r'^\d+\.', line.strip()))
-        score += min(0.2, numbered_sections * 0.05)
+        score += min(0.2, _count_numbered_sections(content) * 0.05)
         
         # Check for paragraphs
-        paragraphs = len([p for p in content.split('\n\n') if p.strip()])
-        score += min(0.2, paragraphs * 0.01)
+        score += min(0.2, paragraph_count * 0.01)
         
         # Check for consistent formatting
         if len(content) > 500:
@@ -173,12 +329,18 @@ class ContentAnalysisTool(Tool):
 class ClassifierAgent(BaseAgent):
     """Agent responsible for document classification and type determination"""
     
-    def __init__(self, llm_model: str = "gpt-4"):
+    def __init__(self, llm_model: str = "gpt-4", fast_model: Optional[str] = None):
         super().__init__("ClassifierAgent", AgentType.CLASSIFIER)
-        self.llm = ChatOpenAI(model=llm_model, temperature=0.1)
+        self.llm = ChatOpenAI(model=llm_model, temperature=0.1, max_retries=0)
+        
+        # Classify with the fast model first and escalate to llm_model when it is unsure
+        if fast_model and fast_model != llm_model:
+            classification_tool = DocumentClassificationTool(ChatOpenAI(model=fast_model, temperature=0.1, max_retries=0), fallback_llm=self.llm)
+        else:
+            classification_tool = DocumentClassificationTool(self.llm)
         
         # Add tools
-        self.add_tool(DocumentClassificationTool())
+        self.add_tool(classification_tool)
         self.add_tool(ContentAnalysisTool())
     
     async def run(self, goal: str, context: Dict[str, Any]) -> AgentResult:
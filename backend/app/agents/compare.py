@@ -1,6 +1,7 @@
-import json
+import asyncio
 import re
-from typing import Any, Dict, List, Optional
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -9,6 +10,101 @@ from langchain.schema import HumanMessage, SystemMessage
 
 from .base import BaseAgent, Tool
 from ..models.base import AgentResult, AgentType, Document
+from ..utils import json_fast
+from ..utils.llm_cache import get_llm_cache
+from ..utils.llm_stream import astream_json
+from ..utils.tokens import truncate_to_tokens
+
+
+# Document excerpt sizes sent for comparison, roughly the previous 2000 and 1500 characters
+_COMPARISON_MAX_TOKENS = 500
+_COMPLIANCE_MAX_TOKENS = 375
+
+
+def _validate_comparison(result: Any, differences_key: str) -> Dict[str, Any]:
+    """Check that a comparison response is an object with a list of differences"""
+    if not isinstance(result, dict):
+        raise ValueError(f"Expected a JSON object, got {type(result).__name__}")
+    differences = result.get(differences_key)
+    if not isinstance(differences, list) or not all(isinstance(diff, dict) for diff in differences):
+        raise ValueError(f"Response field '{differences_key}' must be a list of objects")
+    return result
+
+
+async def _cached_json_completion(llm: ChatOpenAI, system_prompt: str, user_prompt: str, differences_key: str, fallback_llm: Optional[ChatOpenAI] = None, is_confident: Optional[Callable[[Any], bool]] = None) -> Dict[str, Any]:
+    """Request a JSON response, sharing one LLM call across identical prompts.
+
+    Responses are cached by prompt, and concurrent comparisons of the same
+    documents wait on the request already in flight instead of sending
+    their own. The response is streamed and parsed as soon as its JSON
+    object closes. Only responses carrying a ``differences_key`` list are
+    cached; malformed ones raise. If a fallback model is given, the prompt is
+    retried on it when the request fails or ``is_confident`` rejects the
+    response.
+    """
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt)
+    ]
+    
+    async def complete(model: ChatOpenAI) -> Dict[str, Any]:
+        return _validate_comparison(await astream_json(model, messages), differences_key)
+    
+    cache = get_llm_cache()
+    result = None
+    try:
+        result = await cache.get_or_compute(
+            cache.make_key(llm.model_name, system_prompt, user_prompt),
+            lambda: complete(llm)
+        )
+    except Exception:
+        if fallback_llm is None:
+            raise
+    
+    # Escalate to the fallback model when the primary fails or is unsure
+    if fallback_llm is not None and (result is None or (is_confident is not None and not is_confident(result))):
+        result = await cache.get_or_compute(
+            cache.make_key(fallback_llm.model_name, system_prompt, user_prompt),
+            lambda: complete(fallback_llm)
+        )
+    return result
+
+
+def _differences_confident(result: Any, differences_key: str, threshold: float) -> bool:
+    """Check whether the average confidence of a comparison's differences reaches threshold"""
+    if not isinstance(result, dict):
+        return False
+    diffs = result.get(differences_key) or []
+    if not diffs:
+        return True
+    return sum(d.get("confidence", 0) for d in diffs) / len(diffs) >= threshold
+
+
+def _identical_comparison_results() -> Tuple[Dict[str, Any], ...]:
+    """Semantic, structural, compliance and entity results for documents with identical content"""
+    return (
+        {
+            "semantic_differences": [],
+            "overall_similarity": 1.0,
+            "key_differences": "None, the documents are identical",
+            "semantic_analysis": "Document contents are identical"
+        },
+        {
+            "structural_differences": [],
+            "structure_similarity": 1.0,
+            "structural_analysis": "Document contents are identical"
+        },
+        {
+            "compliance_differences": [],
+            "compliance_impact": "None, the documents are identical",
+            "risk_delta": "No change"
+        },
+        {
+            "entity_differences": [],
+            "entity_similarity": 1.0,
+            "entity_analysis": "Document contents are identical"
+        }
+    )
 
 
 class ComparisonType(Enum):
@@ -23,17 +119,13 @@ class ComparisonType(Enum):
 class SemanticComparisonTool(Tool):
     """Tool for semantic document comparison"""
     
-    def __init__(self):
+    def __init__(self, llm: ChatOpenAI):
         super().__init__("semantic_compare", "Compare documents semantically")
+        self.llm = llm
     
-    async def execute(self, doc_a_content: str, doc_b_content: str, doc_a_type: str, doc_b_type: str, **kwargs) -> Dict[str, Any]:
+    async def execute(self, doc_a_excerpt: str, doc_b_excerpt: str, doc_a_type: str, doc_b_type: str, **kwargs) -> Dict[str, Any]:
         """Compare documents semantically"""
         try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
             system_prompt = f"""You are an expert document comparison analyst. Compare these two documents semantically.
             
             DOCUMENT A TYPE: {doc_a_type}
@@ -72,23 +164,9 @@ class SemanticComparisonTool(Tool):
             }}
             """
             
-            user_prompt = f"Compare these documents semantically:\n\nDOCUMENT A ({doc_a_type}):\n{doc_a_content[:2000]}...\n\nDOCUMENT B ({doc_b_type}):\n{doc_b_content[:2000]}..."
+            user_prompt = f"Compare these documents semantically:\n\nDOCUMENT A ({doc_a_type}):\n{doc_a_excerpt}...\n\nDOCUMENT B ({doc_b_type}):\n{doc_b_excerpt}..."
             
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
-            
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
-            
-            return json.loads(result_text)
+            return await _cached_json_completion(self.llm, system_prompt, user_prompt, "semantic_differences")
             
         except Exception as e:
             return {
@@ -102,17 +180,15 @@ class SemanticComparisonTool(Tool):
 class StructuralComparisonTool(Tool):
     """Tool for structural document comparison"""
     
-    def __init__(self):
+    def __init__(self, llm: ChatOpenAI, fallback_llm: Optional[ChatOpenAI] = None, escalation_threshold: float = 0.6):
         super().__init__("structural_compare", "Compare document structures")
+        self.llm = llm
+        self.fallback_llm = fallback_llm
+        self.escalation_threshold = escalation_threshold
     
-    async def execute(self, doc_a_content: str, doc_b_content: str, doc_a_type: str, doc_b_type: str, **kwargs) -> Dict[str, Any]:
+    async def execute(self, doc_a_excerpt: str, doc_b_excerpt: str, doc_a_type: str, doc_b_type: str, **kwargs) -> Dict[str, Any]:
         """Compare document structures"""
         try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
             system_prompt = f"""You are an expert document structure analyst. Compare the structure of these two documents.
             
             DOCUMENT A TYPE: {doc_a_type}
@@ -152,23 +228,9 @@ class StructuralComparisonTool(Tool):
             }}
             """
             
-            user_prompt = f"Compare the structure of these documents:\n\nDOCUMENT A ({doc_a_type}):\n{doc_a_content[:2000]}...\n\nDOCUMENT B ({doc_b_type}):\n{doc_b_content[:2000]}..."
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
-            
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
+            user_prompt = f"Compare the structure of these documents:\n\nDOCUMENT A ({doc_a_type}):\n{doc_a_excerpt}...\n\nDOCUMENT B ({doc_b_type}):\n{doc_b_excerpt}..."
             
-            return json.loads(result_text)
+            return await _cached_json_completion(self.llm, system_prompt, user_prompt, "structural_differences", self.fallback_llm, self._is_confident)
             
         except Exception as e:
             return {
@@ -176,22 +238,22 @@ class StructuralComparisonTool(Tool):
                 "structure_similarity": 0.0,
                 "structural_analysis": f"Structural comparison failed: {str(e)}"
             }
+    
+    def _is_confident(self, result: Any) -> bool:
+        """Check whether a comparison is confident enough to skip escalation"""
+        return _differences_confident(result, "structural_differences", self.escalation_threshold)
 
 
 class ComplianceComparisonTool(Tool):
     """Tool for compliance comparison"""
     
-    def __init__(self):
+    def __init__(self, llm: ChatOpenAI):
         super().__init__("compliance_compare", "Compare compliance aspects")
+        self.llm = llm
     
-    async def execute(self, doc_a_content: str, doc_b_content: str, doc_a_risk: Dict, doc_b_risk: Dict, **kwargs) -> Dict[str, Any]:
+    async def execute(self, doc_a_excerpt: str, doc_b_excerpt: str, doc_a_risk: Dict, doc_b_risk: Dict, **kwargs) -> Dict[str, Any]:
         """Compare compliance aspects"""
         try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
             system_prompt = """You are an expert compliance analyst. Compare the compliance aspects of these two documents.
             
             For each compliance difference, provide:
@@ -226,25 +288,11 @@ class ComplianceComparisonTool(Tool):
             """
             
             # Include risk assessment context
-            risk_context = f"\n\nDOCUMENT A RISK ASSESSMENT:\n{json.dumps(doc_a_risk, indent=2)}\n\nDOCUMENT B RISK ASSESSMENT:\n{json.dumps(doc_b_risk, indent=2)}"
-            
-            user_prompt = f"Compare compliance aspects of these documents:{risk_context}\n\nDOCUMENT A:\n{doc_a_content[:1500]}...\n\nDOCUMENT B:\n{doc_b_content[:1500]}..."
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
+            risk_context = f"\n\nDOCUMENT A RISK ASSESSMENT:\n{json_fast.dumps(doc_a_risk)}\n\nDOCUMENT B RISK ASSESSMENT:\n{json_fast.dumps(doc_b_risk)}"
             
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
+            user_prompt = f"Compare compliance aspects of these documents:{risk_context}\n\nDOCUMENT A:\n{doc_a_excerpt}...\n\nDOCUMENT B:\n{doc_b_excerpt}..."
             
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
-            
-            return json.loads(result_text)
+            return await _cached_json_completion(self.llm, system_prompt, user_prompt, "compliance_differences")
             
         except Exception as e:
             return {
@@ -257,17 +305,24 @@ class ComplianceComparisonTool(Tool):
 class EntityComparisonTool(Tool):
     """Tool for entity comparison"""
     
-    def __init__(self):
+    def __init__(self, llm: ChatOpenAI, fallback_llm: Optional[ChatOpenAI] = None, escalation_threshold: float = 0.6):
         super().__init__("entity_compare", "Compare extracted entities")
+        self.llm = llm
+        self.fallback_llm = fallback_llm
+        self.escalation_threshold = escalation_threshold
     
     async def execute(self, doc_a_entities: List[Dict], doc_b_entities: List[Dict], **kwargs) -> Dict[str, Any]:
         """Compare extracted entities"""
+        # Empty lists usually mean extraction did not run or found nothing, which says
+        # nothing about similarity; skip the LLM call and leave the score out
+        if not doc_a_entities and not doc_b_entities:
+            return {
+                "entity_differences": [],
+                "entity_similarity": None,
+                "entity_analysis": "No entities were extracted from either document; entity similarity not assessed"
+            }
+        
         try:
-            from langchain.chat_models import ChatOpenAI
-            from langchain.schema import HumanMessage, SystemMessage
-            
-            llm = ChatOpenAI(model="gpt-4", temperature=0.1)
-            
             system_prompt = """You are an expert entity comparison analyst. Compare the entities extracted from two documents.
             
             For each entity difference, provide:
@@ -301,23 +356,9 @@ class EntityComparisonTool(Tool):
             }
             """
             
-            user_prompt = f"Compare these entities:\n\nDOCUMENT A ENTITIES:\n{json.dumps(doc_a_entities[:20], indent=2)}\n\nDOCUMENT B ENTITIES:\n{json.dumps(doc_b_entities[:20], indent=2)}"
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = await llm.agenerate([messages])
-            result_text = response.generations[0][0].text.strip()
+            user_prompt = f"Compare these entities:\n\nDOCUMENT A ENTITIES:\n{json_fast.dumps(doc_a_entities[:20])}\n\nDOCUMENT B ENTITIES:\n{json_fast.dumps(doc_b_entities[:20])}"
             
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1]
-            
-            return json.loads(result_text)
+            return await _cached_json_completion(self.llm, system_prompt, user_prompt, "entity_differences", self.fallback_llm, self._is_confident)
             
         except Exception as e:
             return {
@@ -325,6 +366,10 @@ class EntityComparisonTool(Tool):
                 "entity_similarity": 0.0,
                 "entity_analysis": f"Entity comparison failed: {str(e)}"
             }
+    
+    def _is_confident(self, result: Any) -> bool:
+        """Check whether a comparison is confident enough to skip escalation"""
+        return _differences_confident(result, "entity_differences", self.escalation_threshold)
 
 
 class ComparisonSummaryTool(Tool):
@@ -343,44 +388,37 @@ class ComparisonSummaryTool(Tool):
                 entity_result.get("entity_similarity", 0.0)
             ]
             
-            # Weighted average (semantic gets higher weight)
+            # Weighted average (semantic gets higher weight); unscored categories are
+            # left out and the remaining weights renormalized
             weights = [0.5, 0.3, 0.2]
-            overall_similarity = sum(s * w for s, w in zip(similarities, weights))
-            
-            # Count differences by severity
-            all_differences = []
-            
-            semantic_diffs = semantic_result.get("semantic_differences", [])
-            for diff in semantic_diffs:
-                diff["category"] = "semantic"
-                all_differences.append(diff)
-            
-            structural_diffs = structural_result.get("structural_differences", [])
-            for diff in structural_diffs:
-                diff["category"] = "structural"
-                all_differences.append(diff)
+            scored = [(s, w) for s, w in zip(similarities, weights) if s is not None]
+            total_weight = sum(w for _, w in scored)
+            overall_similarity = sum(s * w for s, w in scored) / total_weight if total_weight else 0.0
             
             compliance_diffs = compliance_result.get("compliance_differences", [])
-            for diff in compliance_diffs:
-                diff["category"] = "compliance"
-                all_differences.append(diff)
             
-            entity_diffs = entity_result.get("entity_differences", [])
-            for diff in entity_diffs:
-                diff["category"] = "entity"
-                all_differences.append(diff)
-            
-            # Severity distribution
-            severity_dist = {"LOW": 0, "MEDIUM": 0, "HIGH": 0, "CRITICAL": 0}
-            for diff in all_differences:
-                severity = diff.get("severity", "LOW")
-                severity_dist[severity] += 1
-            
-            # Category distribution
+            # Tag each difference with its category and tally confidence in a single pass
+            all_differences = []
             category_dist = {}
-            for diff in all_differences:
-                category = diff.get("category", "unknown")
-                category_dist[category] = category_dist.get(category, 0) + 1
+            confidence_by_category = {}
+            for category, diffs in (
+                ("semantic", semantic_result.get("semantic_differences", [])),
+                ("structural", structural_result.get("structural_differences", [])),
+                ("compliance", compliance_diffs),
+                ("entity", entity_result.get("entity_differences", []))
+            ):
+                confidence_sum = 0.0
+                for diff in diffs:
+                    diff["category"] = category
+                    confidence_sum += diff.get("confidence", 0)
+                if diffs:
+                    category_dist[category] = len(diffs)
+                    confidence_by_category[category] = confidence_sum / len(diffs)
+                all_differences.extend(diffs)
+            
+            # Severity distribution; unexpected labels get their own bucket instead of failing the summary
+            severity_dist = {"LOW": 0, "MEDIUM": 0, "HIGH": 0, "CRITICAL": 0}
+            severity_dist.update(Counter(str(diff.get("severity") or "LOW").upper() for diff in all_differences))
             
             # Generate insights
             insights = []
@@ -392,9 +430,9 @@ class ComparisonSummaryTool(Tool):
             else:
                 insights.append("Documents show significant differences requiring careful review")
             
-            critical_diffs = [d for d in all_differences if d.get("severity") == "CRITICAL"]
-            if critical_diffs:
-                insights.append(f"Found {len(critical_diffs)} critical differences requiring immediate attention")
+            critical_count = severity_dist["CRITICAL"]
+            if critical_count:
+                insights.append(f"Found {critical_count} critical differences requiring immediate attention")
             
             compliance_impact = compliance_result.get("compliance_impact", "")
             if "risk" in compliance_impact.lower() or "compliance" in compliance_impact.lower():
@@ -403,11 +441,10 @@ class ComparisonSummaryTool(Tool):
             # Generate recommendations
             recommendations = []
             
-            if critical_diffs:
+            if critical_count:
                 recommendations.append("Immediate review required for critical differences")
             
-            high_diffs = [d for d in all_differences if d.get("severity") == "HIGH"]
-            if high_diffs:
+            if severity_dist["HIGH"]:
                 recommendations.append("High-priority review recommended for high-severity differences")
             
             if compliance_diffs:
@@ -421,6 +458,7 @@ class ComparisonSummaryTool(Tool):
                 "total_differences": len(all_differences),
                 "severity_distribution": severity_dist,
                 "category_distribution": category_dist,
+                "confidence_by_category": confidence_by_category,
                 "insights": insights,
                 "recommendations": recommendations,
                 "comparison_summary": {
@@ -437,6 +475,7 @@ class ComparisonSummaryTool(Tool):
                 "total_differences": 0,
                 "severity_distribution": {},
                 "category_distribution": {},
+                "confidence_by_category": {},
                 "insights": [f"Summary generation failed: {str(e)}"],
                 "recommendations": ["Manual review required"],
                 "comparison_summary": {}
@@ -446,15 +485,21 @@ class ComparisonSummaryTool(Tool):
 class CompareAgent(BaseAgent):
     """Agent responsible for document comparison and analysis"""
     
-    def __init__(self, llm_model: str = "gpt-4"):
+    def __init__(self, llm_model: str = "gpt-4", fast_model: Optional[str] = None):
         super().__init__("CompareAgent", AgentType.COMPARE)
-        self.llm = ChatOpenAI(model=llm_model, temperature=0.1)
+        self.llm = ChatOpenAI(model=llm_model, temperature=0.1, max_retries=0)
+        
+        # Structural and entity comparisons run on the fast model and escalate to llm_model when it fails or is unsure
+        if fast_model and fast_model != llm_model:
+            fast_llm, fallback_llm = ChatOpenAI(model=fast_model, temperature=0.1, max_retries=0), self.llm
+        else:
+            fast_llm, fallback_llm = self.llm, None
         
         # Add tools
-        self.add_tool(SemanticComparisonTool())
-        self.add_tool(StructuralComparisonTool())
-        self.add_tool(ComplianceComparisonTool())
-        self.add_tool(EntityComparisonTool())
+        self.add_tool(SemanticComparisonTool(self.llm))
+        self.add_tool(StructuralComparisonTool(fast_llm, fallback_llm=fallback_llm))
+        self.add_tool(ComplianceComparisonTool(self.llm))
+        self.add_tool(EntityComparisonTool(fast_llm, fallback_llm=fallback_llm))
         self.add_tool(ComparisonSummaryTool())
     
     async def run(self, goal: str, context: Dict[str, Any]) -> AgentResult:
@@ -475,45 +520,14 @@ class CompareAgent(BaseAgent):
             doc_a_type = document_a.doc_type.value if document_a.doc_type else "unknown"
             doc_b_type = document_b.doc_type.value if document_b.doc_type else "unknown"
             
-            doc_a_entities = document_a.metadata.get("entities", [])
-            doc_b_entities = document_b.metadata.get("entities", [])
-            
-            doc_a_risk = document_a.metadata.get("risk_assessment", {})
-            doc_b_risk = document_b.metadata.get("risk_assessment", {})
-            
-            # Perform semantic comparison
-            semantic_tool = self.get_tool("semantic_compare")
-            semantic_result = await semantic_tool.execute(
-                doc_a_content=document_a.content,
-                doc_b_content=document_b.content,
-                doc_a_type=doc_a_type,
-                doc_b_type=doc_b_type
-            )
-            
-            # Perform structural comparison
-            structural_tool = self.get_tool("structural_compare")
-            structural_result = await structural_tool.execute(
-                doc_a_content=document_a.content,
-                doc_b_content=document_b.content,
-                doc_a_type=doc_a_type,
-                doc_b_type=doc_b_type
-            )
-            
-            # Perform compliance comparison
-            compliance_tool = self.get_tool("compliance_compare")
-            compliance_result = await compliance_tool.execute(
-                doc_a_content=document_a.content,
-                doc_b_content=document_b.content,
-                doc_a_risk=doc_a_risk,
-                doc_b_risk=doc_b_risk
-            )
-            
-            # Perform entity comparison
-            entity_tool = self.get_tool("entity_compare")
-            entity_result = await entity_tool.execute(
-                doc_a_entities=doc_a_entities,
-                doc_b_entities=doc_b_entities
-            )
+            # Identical content has no differences to find, so the LLM comparisons are skipped
+            identical = document_a.content == document_b.content
+            if identical:
+                semantic_result, structural_result, compliance_result, entity_result = _identical_comparison_results()
+            else:
+                semantic_result, structural_result, compliance_result, entity_result = await self._compare_documents(
+                    document_a, document_b, doc_a_type, doc_b_type
+                )
             
             # Generate comparison summary
             summary_tool = self.get_tool("generate_summary")
@@ -551,13 +565,7 @@ class CompareAgent(BaseAgent):
             }
             
             # Calculate confidence
-            confidence = self._calculate_confidence(
-                semantic_result,
-                structural_result,
-                compliance_result,
-                entity_result,
-                comparison_summary
-            )
+            confidence = 1.0 if identical else self._calculate_confidence(comparison_summary)
             
             # Generate rationale
             overall_similarity = comparison_summary.get("overall_similarity", 0.0)
@@ -587,33 +595,65 @@ class CompareAgent(BaseAgent):
                 next_suggested_action="Manual comparison required"
             )
     
-    def _calculate_confidence(self, semantic_result: Dict, structural_result: Dict, compliance_result: Dict, entity_result: Dict, summary: Dict) -> float:
-        """Calculate confidence based on comparison results"""
-        confidence = 0.5  # Base confidence
+    async def compare_many(self, goal: str, document_a: Document, documents_b: List[Document]) -> List[AgentResult]:
+        """Compare one document against several others concurrently, returning results in input order"""
+        return await self.run_batch(goal, [{"document_a": document_a, "document_b": document_b} for document_b in documents_b])
+    
+    async def _compare_documents(self, document_a: Document, document_b: Document, doc_a_type: str, doc_b_type: str) -> Tuple[Dict[str, Any], ...]:
+        """Run the semantic, structural, compliance and entity comparisons"""
+        doc_a_entities = document_a.metadata.get("entities", [])
+        doc_b_entities = document_b.metadata.get("entities", [])
         
-        # Semantic analysis confidence
-        semantic_diffs = semantic_result.get("semantic_differences", [])
-        if semantic_diffs:
-            avg_semantic_confidence = sum(d.get("confidence", 0) for d in semantic_diffs) / len(semantic_diffs)
-            confidence += avg_semantic_confidence * 0.2
+        doc_a_risk = document_a.metadata.get("risk_assessment", {})
+        doc_b_risk = document_b.metadata.get("risk_assessment", {})
         
-        # Structural analysis confidence
-        structural_diffs = structural_result.get("structural_differences", [])
-        if structural_diffs:
-            avg_structural_confidence = sum(d.get("confidence", 0) for d in structural_diffs) / len(structural_diffs)
-            confidence += avg_structural_confidence * 0.15
+        # Excerpts are truncated once and shared; compliance gets a shorter one to leave room for risk context
+        doc_a_excerpt = await truncate_to_tokens(document_a.content, _COMPARISON_MAX_TOKENS, self.llm.model_name)
+        doc_b_excerpt = await truncate_to_tokens(document_b.content, _COMPARISON_MAX_TOKENS, self.llm.model_name)
+        doc_a_compliance_excerpt = await truncate_to_tokens(doc_a_excerpt, _COMPLIANCE_MAX_TOKENS, self.llm.model_name)
+        doc_b_compliance_excerpt = await truncate_to_tokens(doc_b_excerpt, _COMPLIANCE_MAX_TOKENS, self.llm.model_name)
         
-        # Compliance analysis confidence
-        compliance_diffs = compliance_result.get("compliance_differences", [])
-        if compliance_diffs:
-            avg_compliance_confidence = sum(d.get("confidence", 0) for d in compliance_diffs) / len(compliance_diffs)
-            confidence += avg_compliance_confidence * 0.15
+        # The four comparisons are independent, so their LLM round-trips run concurrently
+        results = await asyncio.gather(
+            self.get_tool("semantic_compare").execute(
+                doc_a_excerpt=doc_a_excerpt,
+                doc_b_excerpt=doc_b_excerpt,
+                doc_a_type=doc_a_type,
+                doc_b_type=doc_b_type
+            ),
+            self.get_tool("structural_compare").execute(
+                doc_a_excerpt=doc_a_excerpt,
+                doc_b_excerpt=doc_b_excerpt,
+                doc_a_type=doc_a_type,
+                doc_b_type=doc_b_type
+            ),
+            self.get_tool("compliance_compare").execute(
+                doc_a_excerpt=doc_a_compliance_excerpt,
+                doc_b_excerpt=doc_b_compliance_excerpt,
+                doc_a_risk=doc_a_risk,
+                doc_b_risk=doc_b_risk
+            ),
+            self.get_tool("entity_compare").execute(
+                doc_a_entities=doc_a_entities,
+                doc_b_entities=doc_b_entities
+            ),
+            return_exceptions=True
+        )
+        
+        # A comparison that raised counts as finding nothing rather than failing the others
+        return tuple(
+            {"error": str(result)} if isinstance(result, Exception) else result
+            for result in results
+        )
+    
+    def _calculate_confidence(self, summary: Dict) -> float:
+        """Calculate confidence based on comparison results"""
+        confidence = 0.5  # Base confidence
         
-        # Entity analysis confidence
-        entity_diffs = entity_result.get("entity_differences", [])
-        if entity_diffs:
-            avg_entity_confidence = sum(d.get("confidence", 0) for d in entity_diffs) / len(entity_diffs)
-            confidence += avg_entity_confidence * 0.1
+        # Average per-difference confidence of each analysis, weighted by its importance
+        confidence_by_category = summary.get("confidence_by_category", {})
+        for category, weight in (("semantic", 0.2), ("structural", 0.15), ("compliance", 0.15), ("entity", 0.1)):
+            confidence += confidence_by_category.get(category, 0.0) * weight
         
         # Overall analysis completeness
         total_differences = summary.get("total_differences", 0)
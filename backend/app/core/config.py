@@ -53,6 +53,7 @@ class Settings(PydanticBaseSettings):
     # AI/ML settings
     OPENAI_API_KEY: str = Field(default="", env="OPENAI_API_KEY")
     OPENAI_MODEL: str = Field(default="gpt-4", env="OPENAI_MODEL")
+    OPENAI_FAST_MODEL: str = Field(default="gpt-4o-mini", env="OPENAI_FAST_MODEL")
     OPENAI_MAX_TOKENS: int = Field(default=4000, env="OPENAI_MAX_TOKENS")
     
     # Agent settings
@@ -122,6 +123,7 @@ def get_agent_config() -> Dict[str, Any]:
         "max_retries": settings.AGENT_MAX_RETRIES,
         "concurrent_limit": settings.AGENT_CONCURRENT_LIMIT,
         "openai_model": settings.OPENAI_MODEL,
+        "openai_fast_model": settings.OPENAI_FAST_MODEL,
         "openai_max_tokens": settings.OPENAI_MAX_TOKENS,
         "chroma_collection": settings.CHROMA_COLLECTION_NAME,
         "chroma_persist_dir": settings.CHROMA_PERSIST_DIRECTORY
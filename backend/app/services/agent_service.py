@@ -19,6 +19,8 @@ from ..agents.sentiment import SentimentAnalysisAgent
 from ..models.base import Document, AgentResult, AgentType
 from ..core.config import settings
 from ..core.monitoring import get_monitor
+from ..utils import llm_stream
+from ..utils.llm_cache import get_llm_cache
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +64,8 @@ class AgentService:
                 llm_model=settings.OPENAI_MODEL
             )
             self.agent_mapping["classifier"] = ClassifierAgent(
-                llm_model=settings.OPENAI_MODEL
+                llm_model=settings.OPENAI_MODEL,
+                fast_model=settings.OPENAI_FAST_MODEL
             )
             self.agent_mapping["entity"] = EntityAgent(
                 llm_model=settings.OPENAI_MODEL
@@ -74,7 +77,8 @@ class AgentService:
                 llm_model=settings.OPENAI_MODEL
             )
             self.agent_mapping["compare"] = CompareAgent(
-                llm_model=settings.OPENAI_MODEL
+                llm_model=settings.OPENAI_MODEL,
+                fast_model=settings.OPENAI_FAST_MODEL
             )
             self.agent_mapping["audit"] = AuditAgent(
                 llm_model=settings.OPENAI_MODEL
@@ -102,6 +106,10 @@ class AgentService:
             self.translator_agent = self.agent_mapping["translator"]
             self.sentiment_agent = self.agent_mapping["sentiment"]
             
+            # Share cached LLM responses across workers when Redis is available
+            await get_llm_cache().initialize(settings.REDIS_URL)
+            llm_stream.configure(settings.AGENT_MAX_RETRIES, settings.AGENT_CONCURRENT_LIMIT)
+            
             self.is_initialized = True
             logger.info("AgentService initialized successfully")
             
@@ -565,6 +573,7 @@ class AgentService:
             "agents": self.get_agent_capabilities(),
             "processing_history_count": len(self.processing_history),
             "workflow_status": self.get_workflow_status(),
+            "llm_cache": get_llm_cache().stats,
             "monitoring": {
                 "enabled": True,
                 "metrics_available": True
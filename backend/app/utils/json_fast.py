@@ -0,0 +1,33 @@
+import re
+from typing import Any
+
+import orjson
+
+
+JSONDecodeError = orjson.JSONDecodeError
+
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize obj to a JSON string.
+    
+    Output is compact unless indent is set. Values orjson cannot encode
+    natively fall back to str(), and non-string dict keys are allowed, so
+    arbitrary agent output can be embedded in prompts without raising.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=str, option=option).decode()
+
+
+def loads(data: Any) -> Any:
+    """Parse a JSON document from str or bytes"""
+    return orjson.loads(data)
+
+
+def extract_json(text: str) -> str:
+    """Return the JSON payload of an LLM response, unwrapping a code fence if present"""
+    match = _JSON_FENCE_RE.search(text)
+    return match.group(1) if match else text
@@ -0,0 +1,179 @@
+import asyncio
+import copy
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from . import json_fast
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """Bounded cache for parsed LLM responses.
+
+    Agent tools call the LLM at a low temperature with prompts that are fully
+    determined by their inputs, so re-running a tool on the same inputs can
+    reuse the previously parsed result instead of paying for another request.
+    Entries expire after ``ttl`` seconds and the least recently used entry is
+    evicted once ``maxsize`` is reached.
+
+    When initialized with a Redis URL, entries are also written to Redis so
+    they are shared between workers and survive restarts; the in-process LRU
+    stays in front of it as the first lookup tier.
+
+    ``get_or_compute`` additionally coalesces concurrent requests for the
+    same key, so identical prompts issued at the same time reach the LLM
+    only once.
+    """
+
+    KEY_PREFIX = "llm_cache:"
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.redis_client = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Event] = {}
+
+    async def initialize(self, redis_url: Optional[str] = None) -> None:
+        """Attach a Redis backend, staying in-memory if it is unavailable"""
+        if not redis_url:
+            return
+
+        try:
+            client = redis.from_url(redis_url, decode_responses=True)
+            await client.ping()
+            self.redis_client = client
+            logger.info("LLM response cache using Redis backend")
+        except Exception as e:
+            logger.warning(f"LLM response cache falling back to in-memory storage: {e}")
+            self.redis_client = None
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str) -> str:
+        """Build a deterministic cache key for a prompt.
+
+        The parts are fed to the hash in a fixed order, each prefixed with
+        its length so that different splits of the same text cannot collide.
+        """
+        digest = hashlib.blake2b(digest_size=32)
+        for part in (model, system_prompt, user_prompt):
+            encoded = part.encode()
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached response, or None on a miss"""
+        value = self._get_local(key)
+        if value is None and self.redis_client is not None:
+            value = await self._get_redis(key)
+            if value is not None:
+                self._set_local(key, value)
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a copy of a parsed response"""
+        self._set_local(key, copy.deepcopy(value))
+
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.set(self.KEY_PREFIX + key, json_fast.dumps(value), ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Failed to write LLM response to Redis: {e}")
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return the cached response for key, computing and storing it on a miss.
+
+        While one caller computes a key, concurrent callers for the same key
+        wait for it and then read the stored result instead of sending a
+        duplicate request. If the computation fails, the next waiter retries.
+        """
+        while key in self._pending:
+            await self._pending[key].wait()
+
+        done = self._pending[key] = asyncio.Event()
+        try:
+            cached = await self.get(key)
+            if cached is not None:
+                return cached
+
+            value = await compute()
+            await self.set(key, value)
+            return value
+        finally:
+            del self._pending[key]
+            done.set()
+
+    def clear(self) -> None:
+        """Drop all locally cached responses and reset statistics"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for instrumentation"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "backend": "redis" if self.redis_client is not None else "memory"
+        }
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def _get_redis(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = await self.redis_client.get(self.KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning(f"Failed to read LLM response from Redis: {e}")
+            return None
+        return json_fast.loads(data) if data else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global cache instance
+_llm_cache = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get the global LLM response cache"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache()
+    return _llm_cache
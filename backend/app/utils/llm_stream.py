@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import random
+import weakref
+from typing import Any, List, Optional
+
+import openai
+from langchain.schema import BaseMessage
+
+from . import json_fast
+
+logger = logging.getLogger(__name__)
+
+# Provider errors worth retrying: throttling, server faults and dropped connections
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    asyncio.TimeoutError
+)
+
+_BACKOFF_BASE_SECONDS = 1.0
+_BACKOFF_MAX_SECONDS = 10.0
+
+# Defaults mirror AGENT_MAX_RETRIES / AGENT_CONCURRENT_LIMIT; AgentService applies the
+# configured values at startup so importing this module does not load settings
+_max_retries = 3
+_concurrent_limit = 10
+
+# Caps concurrent LLM requests process-wide so retries cannot pile onto an overloaded provider.
+# One semaphore per event loop, since a semaphore cannot be shared across loops.
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def configure(max_retries: int, concurrent_limit: int) -> None:
+    """Set the retry budget and process-wide concurrency cap for LLM requests"""
+    global _max_retries, _concurrent_limit
+    _max_retries = max_retries
+    if concurrent_limit != _concurrent_limit:
+        _concurrent_limit = concurrent_limit
+        _llm_semaphores.clear()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _llm_semaphores[loop] = asyncio.Semaphore(_concurrent_limit)
+    return semaphore
+
+
+async def astream_text(llm, messages: List[BaseMessage]) -> str:
+    """Stream a chat completion and return the accumulated response text.
+
+    Tokens are consumed as they arrive instead of waiting on a single
+    blocking generate call, so the response body is already in hand the
+    moment the stream closes.
+    """
+    chunks = []
+    async for chunk in llm.astream(messages):
+        chunks.append(chunk.content)
+    return "".join(chunks).strip()
+
+
+class _JSONValueScanner:
+    """Track bracket depth over streamed text to find the end of the first JSON object or array"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.start: Optional[int] = None
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> Optional[str]:
+        """Append text and return the first complete top-level object or array, if any"""
+        offset = len(self.buffer)
+        self.buffer += text
+
+        for i, char in enumerate(text, offset):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                if self.start is not None:
+                    self.in_string = True
+            elif char in "{[":
+                if self.start is None:
+                    self.start = i
+                self.depth += 1
+            elif char in "}]" and self.start is not None:
+                self.depth -= 1
+                if self.depth == 0:
+                    return self.buffer[self.start:i + 1]
+        return None
+
+
+async def astream_json(llm, messages: List[BaseMessage]) -> Any:
+    """Stream a chat completion and parse its JSON payload.
+
+    The response is scanned as it arrives and parsed as soon as the first
+    top-level object or array closes, so trailing prose or a closing code
+    fence does not have to be waited for. If the stream ends without a
+    balanced value the full text is parsed after unwrapping any code fence.
+
+    Transient provider errors are retried up to AGENT_MAX_RETRIES times with
+    jittered exponential backoff, and at most AGENT_CONCURRENT_LIMIT requests
+    are in flight at once. This is the only retry layer: build the model with
+    max_retries=0 so the client does not retry underneath it while holding a
+    concurrency slot.
+    """
+    for attempt in range(_max_retries + 1):
+        try:
+            async with _get_semaphore():
+                return await _astream_json_once(llm, messages)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == _max_retries:
+                raise
+            delay = random.uniform(0, min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** attempt))
+            logger.warning(f"LLM request failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def _astream_json_once(llm, messages: List[BaseMessage]) -> Any:
+    scanner = _JSONValueScanner()
+    scanning = True
+    stream = llm.astream(messages)
+    try:
+        async for chunk in stream:
+            if not scanning:
+                scanner.buffer += chunk.content
+                continue
+            candidate = scanner.feed(chunk.content)
+            if candidate is not None:
+                try:
+                    return json_fast.loads(candidate)
+                except json_fast.JSONDecodeError:
+                    # Keep reading and fall back to parsing the full response
+                    scanning = False
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    return json_fast.loads(json_fast.extract_json(scanner.buffer.strip()))
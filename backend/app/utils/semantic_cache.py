@@ -0,0 +1,157 @@
+import asyncio
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Cache LLM results by embedding similarity of their input text.
+
+    Near-identical inputs (boilerplate contracts, templated invoices) map to
+    nearly identical embeddings, so a stored result is returned whenever a
+    new input's cosine similarity to a cached one reaches ``threshold``.
+    Embeddings are normalized, making the inner product the cosine, and are
+    kept in a preallocated matrix searched with a single matrix-vector
+    product. Once ``maxsize`` entries are stored, the least recently used
+    slot is overwritten.
+
+    The embedding model is loaded off the event loop on first use. If it
+    cannot be loaded the cache disables itself and every lookup is a miss.
+    The embeddings of the last ``embedding_cache_size`` distinct texts are
+    kept, so re-processing the same text does not run the model again.
+    """
+
+    def __init__(self, threshold: float = 0.9, maxsize: int = 10000, model_name: str = "all-MiniLM-L6-v2", embedding_cache_size: int = 1024):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.model_name = model_name
+        self.embedding_cache_size = embedding_cache_size
+        self.hits = 0
+        self.misses = 0
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._disabled = False
+        self._vectors: Optional[np.ndarray] = None
+        self._values: List[Dict[str, Any]] = []
+        self._last_used: Optional[np.ndarray] = None
+        self._clock = 0
+        self._embeddings: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
+    def _load_model(self):
+        with self._model_lock:
+            if self._model is None and not self._disabled:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception as e:
+                    logger.warning(f"Semantic cache disabled, embedding model unavailable: {e}")
+                    self._disabled = True
+
+    async def _get_model(self):
+        if self._model is None and not self._disabled:
+            await asyncio.to_thread(self._load_model)
+        return self._model
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text off the event loop, or return None if the cache is disabled"""
+        model = await self._get_model()
+        if model is None:
+            return None
+
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        embedding = self._embeddings.get(key)
+        if embedding is not None:
+            self._embeddings.move_to_end(key)
+            return embedding
+
+        embedding = np.asarray(await asyncio.to_thread(model.encode, text, normalize_embeddings=True), dtype=np.float32)
+        # Memoized arrays are shared between callers, so keep them read-only
+        embedding.flags.writeable = False
+        self._embeddings[key] = embedding
+        while len(self._embeddings) > self.embedding_cache_size:
+            self._embeddings.popitem(last=False)
+        return embedding
+
+    def get(self, embedding: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the closest cached result if it is similar enough"""
+        if embedding is None:
+            return None
+
+        if self._values:
+            scores = self._vectors[:len(self._values)] @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                self.hits += 1
+                self._touch(best)
+                return copy.deepcopy(self._values[best])
+
+        self.misses += 1
+        return None
+
+    def set(self, embedding: Optional[np.ndarray], value: Dict[str, Any]) -> None:
+        """Store a copy of a result under its input embedding"""
+        if embedding is None:
+            return
+
+        if self._vectors is None:
+            self._vectors = np.empty((self.maxsize, embedding.shape[0]), dtype=np.float32)
+            self._last_used = np.zeros(self.maxsize, dtype=np.int64)
+
+        if len(self._values) < self.maxsize:
+            slot = len(self._values)
+            self._values.append(copy.deepcopy(value))
+        else:
+            slot = int(np.argmin(self._last_used))
+            self._values[slot] = copy.deepcopy(value)
+
+        self._vectors[slot] = embedding
+        self._touch(slot)
+
+    def clear(self) -> None:
+        """Drop all cached results and reset statistics.
+
+        Memoized embeddings depend only on their text and are kept.
+        """
+        self._vectors = None
+        self._values = []
+        self._last_used = None
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for instrumentation"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._values),
+            "enabled": not self._disabled
+        }
+
+    def _touch(self, slot: int) -> None:
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Global cache instances, one per cached operation
+_semantic_caches: Dict[str, SemanticCache] = {}
+
+
+def get_semantic_cache(name: str) -> SemanticCache:
+    """Get the global semantic cache for an operation"""
+    if name not in _semantic_caches:
+        _semantic_caches[name] = SemanticCache()
+    return _semantic_caches[name]
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Only max_tokens * _MAX_CHARS_PER_TOKEN characters are encoded; typical text
+# averages about 4 characters per token, so this prefix covers the budget
+_MAX_CHARS_PER_TOKEN = 8
+
+# Rough characters-per-token ratio used when no tokenizer is available
+_FALLBACK_CHARS_PER_TOKEN = 4
+
+# A failed load (e.g. the BPE download timing out) is retried after this long
+_LOAD_RETRY_SECONDS = 60.0
+
+_encodings: Dict[str, Any] = {}
+_failed_at: Dict[str, float] = {}
+_load_lock = threading.Lock()
+
+
+def _load_encoding(model: str) -> Optional[Any]:
+    """Load the model's tokenizer, or None if it cannot be loaded right now"""
+    with _load_lock:
+        if model in _encodings:
+            return _encodings[model]
+        failed_at = _failed_at.get(model)
+        if failed_at is not None and time.monotonic() - failed_at < _LOAD_RETRY_SECONDS:
+            return None
+
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"Tokenizer unavailable for {model}, truncating by characters: {e}")
+            _failed_at[model] = time.monotonic()
+            return None
+
+        _encodings[model] = encoding
+        _failed_at.pop(model, None)
+        return encoding
+
+
+async def get_encoding(model: str) -> Optional[Any]:
+    """Return the model's tokenizer, loading it off the event loop on first use.
+
+    Loading may download the BPE file, so it runs in a worker thread. Only
+    successful loads are kept; failures are retried after _LOAD_RETRY_SECONDS.
+    """
+    encoding = _encodings.get(model)
+    if encoding is None:
+        encoding = await asyncio.to_thread(_load_encoding, model)
+    return encoding
+
+
+async def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4") -> str:
+    """Truncate text to at most max_tokens tokens of the model's tokenizer.
+
+    Only a bounded prefix of the text is encoded, so the cost does not grow
+    with document size. Falls back to a character estimate if the tokenizer
+    cannot be loaded.
+    """
+    encoding = await get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * _FALLBACK_CHARS_PER_TOKEN]
+
+    prefix = text[:max_tokens * _MAX_CHARS_PER_TOKEN]
+    tokens = encoding.encode(prefix, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return prefix
+    return encoding.decode(tokens[:max_tokens])
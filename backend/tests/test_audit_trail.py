@@ -0,0 +1,171 @@
+import pytest
+from datetime import datetime
+
+from app.agents.audit import AuditLevel, AuditTrailGeneratorTool, _compact_history, _parse_audit_level
+
+
+def _processing_run(**overrides):
+    """AgentService.processing_history record as stored after a run"""
+    record = {
+        "processing_id": "proc_1",
+        "start_time": "2024-01-01T00:00:00",
+        "end_time": "2024-01-01T00:00:05",
+        "document_id": "doc_1",
+        "goal": "Classify and summarize",
+        "stages": [{"stage_id": "ingest"}, {"stage_id": "classify"}],
+        "status": "completed",
+        "duration": 5.0,
+        "orchestration_result": {
+            "output": {"large": "x" * 1000},
+            "rationale": "Workflow completed",
+            "confidence": 0.9
+        },
+        "workflow_status": {"completed_stages": ["ingest"], "failed_stages": ["classify"]}
+    }
+    record.update(overrides)
+    return record
+
+
+def _stage_record(**overrides):
+    """Orchestrator execution_history record"""
+    record = {
+        "stage_id": "classify",
+        "stage_name": "Classification",
+        "agent_type": "classifier",
+        "start_time": "2024-01-01T00:00:01",
+        "duration_seconds": 1.5,
+        "status": "SUCCESS",
+        "result": {"output": {"large": "x" * 1000}, "rationale": "Looks like a contract", "confidence": 0.8}
+    }
+    record.update(overrides)
+    return record
+
+
+class TestCompactHistory:
+    """Test cases for processing history compaction"""
+
+    def test_processing_run_keeps_run_fields(self):
+        """Processing runs keep goal, duration and orchestration confidence"""
+        item = _compact_history([_processing_run()])[0]
+
+        assert item["processing_id"] == "proc_1"
+        assert item["goal"] == "Classify and summarize"
+        assert item["duration"] == 5.0
+        assert item["status"] == "completed"
+        assert item["stage_count"] == 2
+        assert item["failed_stages"] == ["classify"]
+        assert item["confidence"] == 0.9
+        assert item["rationale"] == "Workflow completed"
+        assert "orchestration_result" not in item
+
+    def test_failed_processing_run_keeps_error(self):
+        """Runs that raised keep their error and have no result"""
+        record = _processing_run(status="failed", error="boom")
+        del record["orchestration_result"]
+        item = _compact_history([record])[0]
+
+        assert item["status"] == "failed"
+        assert item["error"] == "boom"
+        assert "confidence" not in item
+
+    def test_stage_record_keeps_stage_fields(self):
+        """Stage records keep stage fields and the result summary"""
+        item = _compact_history([_stage_record()])[0]
+
+        assert item["stage_name"] == "Classification"
+        assert item["duration_seconds"] == 1.5
+        assert item["confidence"] == 0.8
+        assert item["rationale"] == "Looks like a contract"
+        assert "result" not in item
+
+
+class TestBuildTrail:
+    """Test cases for the deterministic audit trail builder"""
+
+    @pytest.fixture
+    def tool(self):
+        """Audit trail tool; the deterministic path never touches the LLM"""
+        return AuditTrailGeneratorTool(llm=None)
+
+    @pytest.fixture
+    def doc_ctx(self):
+        """Resolved document context"""
+        return {"id": "doc_1", "filename": "contract.pdf", "uploaded_at": datetime(2024, 1, 1)}
+
+    def test_completed_processing_run(self, tool, doc_ctx):
+        """Completed processing runs are low severity and compliant"""
+        trail = tool._build_trail(doc_ctx, _compact_history([_processing_run(workflow_status={})]))
+        event = trail["audit_events"][1]
+
+        assert event["event_type"] == "document_processing"
+        assert event["severity"] == "LOW"
+        assert event["description"] == "Workflow completed"
+        assert event["metadata"]["processing_id"] == "proc_1"
+        assert event["metadata"]["goal"] == "Classify and summarize"
+        assert event["metadata"]["duration_seconds"] == 5.0
+        assert trail["compliance_status"] == "COMPLIANT"
+        assert trail["audit_summary"].endswith("1 processing records, 0 failed")
+
+    def test_failed_processing_run(self, tool, doc_ctx):
+        """Lowercase failed status from AgentService is treated as a failure"""
+        record = _processing_run(status="failed", error="orchestrator crashed")
+        del record["orchestration_result"]
+        trail = tool._build_trail(doc_ctx, _compact_history([record]))
+        event = trail["audit_events"][1]
+
+        assert event["severity"] == "HIGH"
+        assert "orchestrator crashed" in event["description"]
+        assert event["metadata"]["status"] == "FAILED"
+        assert trail["compliance_status"] == "REQUIRES_REVIEW"
+        assert trail["audit_summary"].endswith("1 failed")
+
+    def test_failed_stages_of_run_are_recommended_for_review(self, tool, doc_ctx):
+        """Stages that failed inside a completed run are surfaced as recommendations"""
+        trail = tool._build_trail(doc_ctx, _compact_history([_processing_run()]))
+
+        assert any("classify" in recommendation for recommendation in trail["recommendations"])
+
+    def test_stage_records(self, tool, doc_ctx):
+        """Orchestrator stage records keep their stage names and failures"""
+        history = _compact_history([
+            _stage_record(),
+            _stage_record(stage_id="risk", stage_name="Risk", agent_type="risk", status="FAILED", error="timeout", result=None)
+        ])
+        trail = tool._build_trail(doc_ctx, history)
+        ok_event, failed_event = trail["audit_events"][1:]
+
+        assert ok_event["event_type"] == "classifier_processing"
+        assert ok_event["metadata"]["stage_id"] == "classify"
+        assert ok_event["severity"] == "LOW"
+        assert failed_event["severity"] == "HIGH"
+        assert failed_event["description"] == "Risk failed: timeout"
+        assert trail["compliance_status"] == "REQUIRES_REVIEW"
+
+    def test_low_confidence_stage(self, tool, doc_ctx):
+        """Low-confidence results are flagged for review"""
+        history = _compact_history([_stage_record(result={"rationale": "Unclear", "confidence": 0.3})])
+        event = tool._build_trail(doc_ctx, history)["audit_events"][1]
+
+        assert event["severity"] == "MEDIUM"
+        assert event["confidence"] == 0.3
+
+    def test_empty_history(self, tool, doc_ctx):
+        """No history means the audit cannot vouch for compliance"""
+        trail = tool._build_trail(doc_ctx, [])
+
+        assert trail["compliance_status"] == "UNKNOWN"
+        assert len(trail["audit_events"]) == 1
+
+
+class TestParseAuditLevel:
+    """Test cases for audit level parsing"""
+
+    def test_known_levels(self):
+        """Known levels parse case-insensitively"""
+        assert _parse_audit_level("Regulatory") is AuditLevel.REGULATORY
+        assert _parse_audit_level(AuditLevel.BASIC) is AuditLevel.BASIC
+
+    def test_unknown_level_falls_back_to_standard(self):
+        """Unknown or missing levels fall back to standard"""
+        assert _parse_audit_level("exhaustive") is AuditLevel.STANDARD
+        assert _parse_audit_level(None) is AuditLevel.STANDARD
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.agents.base import BaseAgent, Tool
+from app.models.base import AgentType
+
+
+class EchoTool(Tool):
+    """Tool that returns its arguments"""
+
+    async def execute(self, **kwargs):
+        return kwargs
+
+
+class ToolListAgent(BaseAgent):
+    """Agent registering tools through add_tool"""
+
+    def __init__(self):
+        super().__init__("ToolListAgent", AgentType.CLASSIFIER)
+        self.add_tool(EchoTool("echo", "Echo arguments"))
+
+    async def run(self, goal, context):
+        pass
+
+
+class ToolMappingAgent(BaseAgent):
+    """Agent assigning a name-to-tool mapping directly"""
+
+    def __init__(self):
+        super().__init__("ToolMappingAgent", AgentType.CLASSIFIER)
+        self.tools = {"summarize": self.summarize_tool}
+
+    def summarize_tool(self, content):
+        return content[:10]
+
+    async def run(self, goal, context):
+        pass
+
+
+class DelayAgent(BaseAgent):
+    """Agent that sleeps for the requested delay and returns it"""
+
+    def __init__(self):
+        super().__init__("DelayAgent", AgentType.CLASSIFIER)
+        self.active = 0
+        self.max_active = 0
+
+    async def run(self, goal, context):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(context["delay"])
+        self.active -= 1
+        return context["delay"]
+
+
+class TestToolLookup:
+    """Test cases for BaseAgent tool lookup"""
+
+    def test_added_tools_are_found(self):
+        """Tools registered with add_tool are found by name"""
+        agent = ToolListAgent()
+
+        assert agent.get_tool("echo") is agent.tools[0]
+        assert agent.get_tool("missing") is None
+
+    def test_first_tool_wins_on_duplicate_names(self):
+        """Lookup returns the first tool registered under a name"""
+        agent = ToolListAgent()
+        agent.add_tool(EchoTool("echo", "Shadowed echo"))
+
+        assert agent.get_tool("echo") is agent.tools[0]
+
+    def test_assigned_tool_mapping_is_found(self):
+        """Agents assigning a tool mapping directly are indexed too"""
+        agent = ToolMappingAgent()
+
+        assert agent.get_tool("summarize") == agent.summarize_tool
+
+    def test_reassigning_tools_replaces_index(self):
+        """Replacing the toolkit drops tools that are no longer present"""
+        agent = ToolListAgent()
+        agent.tools = [EchoTool("other", "Other tool")]
+
+        assert agent.get_tool("echo") is None
+        assert agent.get_tool("other").description == "Other tool"
+
+
+class TestRunBatch:
+    """Test cases for BaseAgent.run_batch"""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_input_order(self):
+        """Contexts run concurrently and results come back in input order"""
+        agent = DelayAgent()
+
+        results = await agent.run_batch("goal", [{"delay": 0.03}, {"delay": 0.0}, {"delay": 0.01}])
+
+        assert results == [0.03, 0.0, 0.01]
+        assert agent.max_active == 3
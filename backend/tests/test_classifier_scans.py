@@ -0,0 +1,118 @@
+import random
+import re
+
+import pytest
+
+from app.agents.classifier import (
+    ContentAnalysisTool,
+    _FINANCIAL_TERMS,
+    _FINANCIAL_TERMS_RE,
+    _LEGAL_TERMS,
+    _LEGAL_TERMS_RE,
+    _count_headers,
+    _count_numbered_sections,
+    _find_terms,
+    _keyword_classification
+)
+
+
+def _substring_terms(terms, content_lower):
+    """Reference term scan: one substring test per term"""
+    return [term for term in terms if term in content_lower]
+
+
+def _line_headers(content):
+    """Reference header count: split lines and test each one"""
+    return sum(1 for line in content.split('\n') if line.strip().isupper() and len(line.strip()) < 100)
+
+
+def _line_numbered_sections(content):
+    """Reference numbered section count: split lines and match each stripped line"""
+    return sum(1 for line in content.split('\n') if re.match(r'^\d+\.', line.strip()))
+
+
+def _findall_dates(content):
+    """Reference date extraction: run each pattern in turn and keep the first five"""
+    dates = []
+    for pattern in (r'\d{1,2}/\d{1,2}/\d{2,4}', r'\d{4}-\d{2}-\d{2}', r'\w+ \d{1,2},? \d{4}'):
+        dates.extend(re.findall(pattern, content))
+    return dates[:5]
+
+
+def _random_text(rng, pieces, length):
+    return "".join(rng.choice(pieces) for _ in range(length))
+
+
+class TestKeywordClassification:
+    """Test cases for anchor-phrase classification"""
+
+    def test_unambiguous_header(self):
+        """Two distinct anchors of one type classify without the LLM"""
+        content = "INVOICE #1042\nBill To: Acme Corp\nBalance Due: $1,200.00\n" + "Line item\n" * 100
+
+        result = _keyword_classification(content)
+
+        assert result["document_type"] == "invoice"
+        assert result["domain"] == "financial"
+        assert result["model"] == "keyword_anchors"
+        assert result["key_indicators"] == ["balance due", "bill to", "invoice #"]
+
+    def test_mixed_anchor_header(self):
+        """Anchors of more than one type leave the document to the LLM"""
+        content = "THIS AGREEMENT is made by and between the parties.\nInvoice #7, balance due on signing."
+
+        assert _keyword_classification(content) is None
+
+    def test_single_weak_anchor(self):
+        """A single anchor phrase, however often repeated, is not enough"""
+        content = "Whereas the parties met. Whereas they agreed. WHEREAS they signed."
+
+        assert _keyword_classification(content) is None
+
+    def test_anchors_beyond_header_are_ignored(self):
+        """Only the document header is scanned"""
+        content = "x" * 600 + " this agreement by and between"
+
+        assert _keyword_classification(content) is None
+
+
+class TestScanEquivalence:
+    """Randomized checks that the single-pass scans match the original per-line and per-term scans"""
+
+    @pytest.mark.parametrize("terms,pattern", [(_LEGAL_TERMS, _LEGAL_TERMS_RE), (_FINANCIAL_TERMS, _FINANCIAL_TERMS_RE)])
+    def test_term_scan_matches_substring_scan(self, terms, pattern):
+        """The lookahead pattern finds exactly the terms a substring test finds"""
+        rng = random.Random(0)
+        # Fragments of the terms make partial and overlapping matches common
+        pieces = list(terms) + [term[:len(term) // 2] for term in terms] + [term[len(term) // 2:] for term in terms] + [" ", "\n", "-", "x"]
+
+        for _ in range(500):
+            content_lower = _random_text(rng, pieces, rng.randint(0, 40)).lower()
+            assert _find_terms(pattern, terms, content_lower) == _substring_terms(terms, content_lower)
+
+    def test_header_and_section_counts_match_line_scan(self):
+        """Multiline regex counts match splitting the content into lines"""
+        rng = random.Random(0)
+        pieces = ["A", "B", "Z", "a", "z", "É", "é", "1", "42", ".", " ", "\t", "\r", "\x0b", "\x0c", " ", "\n", "\n", "-", "#"]
+
+        for _ in range(2000):
+            content = _random_text(rng, pieces, rng.randint(0, 60))
+            assert _count_headers(content) == _line_headers(content)
+            assert _count_numbered_sections(content) == _line_numbered_sections(content)
+
+    def test_long_lines_are_not_headers(self):
+        """Lines of 100 characters or more never count as headers"""
+        content = "A" * 99 + "\n" + "B" * 100 + "\n"
+
+        assert _count_headers(content) == _line_headers(content) == 1
+
+    def test_date_extraction_matches_per_pattern_scan(self):
+        """Dates come out in pattern order, with ISO dates found even inside written-out matches"""
+        extract_dates = ContentAnalysisTool()._extract_dates
+        assert extract_dates("Page 3 2024-01-15") == ["2024-01-15", "Page 3 2024"]
+
+        rng = random.Random(0)
+        pieces = ["2024", "-01", "-15", "/", "3", "12", " ", ", ", "Jan", "Page", "\n"]
+        for _ in range(2000):
+            content = _random_text(rng, pieces, rng.randint(0, 30))
+            assert extract_dates(content) == _findall_dates(content)
@@ -0,0 +1,45 @@
+import pytest
+
+from app.agents.classifier import _validate_classification
+
+
+def _classification(**overrides):
+    result = {
+        "document_type": "contract",
+        "domain": "legal",
+        "confidence": 0.8,
+        "reasoning": "Mentions parties and obligations",
+        "key_indicators": ["party"]
+    }
+    result.update(overrides)
+    return result
+
+
+class TestValidateClassification:
+    """Test cases for classification response validation"""
+
+    def test_valid_classification(self):
+        """Known types with an in-range confidence pass, with confidence as a float"""
+        result = _validate_classification(_classification(confidence=1))
+
+        assert result["confidence"] == 1.0
+        assert isinstance(result["confidence"], float)
+
+    @pytest.mark.parametrize("overrides", [
+        {"document_type": "memo"},
+        {"document_type": None},
+        {"confidence": "high"},
+        {"confidence": 1.5},
+        {"confidence": True},
+        {"domain": None},
+        {"reasoning": ["a"]}
+    ])
+    def test_invalid_classification(self, overrides):
+        """Unknown types, bad confidences and missing text fields are rejected"""
+        with pytest.raises(ValueError):
+            _validate_classification(_classification(**overrides))
+
+    def test_non_object_response(self):
+        """Responses that are not objects are rejected"""
+        with pytest.raises(ValueError):
+            _validate_classification([_classification()])
@@ -0,0 +1,22 @@
+from app.utils import json_fast
+
+
+class TestJsonFast:
+    """Test cases for the json_fast helpers"""
+
+    def test_extract_json_unwraps_fence(self):
+        """Fenced payloads are returned without the fence or surrounding text"""
+        text = 'Here you go:\n```json\n{"a": 1}\n```\nDone.'
+
+        assert json_fast.loads(json_fast.extract_json(text)) == {"a": 1}
+
+    def test_extract_json_plain_and_unterminated(self):
+        """Bare JSON is returned unchanged and a missing closing fence is tolerated"""
+        assert json_fast.extract_json('{"a": 1}') == '{"a": 1}'
+        assert json_fast.loads(json_fast.extract_json('```\n{"a": 1}')) == {"a": 1}
+
+    def test_dumps_round_trip(self):
+        """Non-string keys and non-JSON values are serialized instead of raising"""
+        data = json_fast.loads(json_fast.dumps({1: {"x"}}))
+
+        assert data == {"1": "{'x'}"}
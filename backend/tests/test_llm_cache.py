@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.utils.llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def cache():
+    """Create a small LLM response cache for testing"""
+    return LLMResponseCache(maxsize=2, ttl=60)
+
+
+class TestLLMResponseCache:
+    """Test cases for LLMResponseCache"""
+
+    def test_make_key_is_deterministic(self):
+        """Identical prompts map to the same key, different prompts do not"""
+        key_a = LLMResponseCache.make_key("gpt-4", "system", "user")
+        key_b = LLMResponseCache.make_key("gpt-4", "system", "user")
+        key_c = LLMResponseCache.make_key("gpt-4", "system", "other user")
+
+        assert key_a == key_b
+        assert key_a != key_c
+
+    def test_make_key_separates_parts(self):
+        """Moving text between prompt parts changes the key"""
+        key_a = LLMResponseCache.make_key("gpt-4", "ab", "c")
+        key_b = LLMResponseCache.make_key("gpt-4", "a", "bc")
+
+        assert key_a != key_b
+
+    @pytest.mark.asyncio
+    async def test_get_returns_copy(self, cache):
+        """Mutating a cached result does not change the stored entry"""
+        await cache.set("key", {"items": [1, 2]})
+
+        first = await cache.get("key")
+        first["items"].append(3)
+
+        assert await cache.get("key") == {"items": [1, 2]}
+
+    @pytest.mark.asyncio
+    async def test_miss_and_expiry(self, cache):
+        """Missing and expired keys return None"""
+        assert await cache.get("missing") is None
+
+        cache.ttl = -1
+        await cache.set("key", {"value": 1})
+        assert await cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, cache):
+        """The least recently used entry is evicted at capacity"""
+        await cache.set("a", {"value": "a"})
+        await cache.set("b", {"value": "b"})
+        await cache.get("a")
+        await cache.set("c", {"value": "c"})
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == {"value": "a"}
+        assert len(cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_stats_count_hits_and_misses(self, cache):
+        """Lookups are counted for instrumentation"""
+        await cache.get("missing")
+        await cache.set("key", {"value": 1})
+        await cache.get("key")
+        await cache.get("key")
+
+        stats = cache.stats
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+        assert stats["backend"] == "memory"
+
+    @pytest.mark.asyncio
+    async def test_get_or_compute_coalesces_concurrent_requests(self, cache):
+        """Concurrent callers for one key share a single computation"""
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return {"value": calls}
+
+        results = await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(3)))
+
+        assert calls == 1
+        assert results == [{"value": 1}] * 3
+
+    @pytest.mark.asyncio
+    async def test_get_or_compute_retries_after_failure(self, cache):
+        """A failed computation is not cached and the next caller recomputes"""
+        async def fail():
+            raise ValueError("bad response")
+
+        async def succeed():
+            return {"value": 1}
+
+        with pytest.raises(ValueError):
+            await cache.get_or_compute("key", fail)
+
+        assert await cache.get_or_compute("key", succeed) == {"value": 1}
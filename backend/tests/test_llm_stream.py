@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from app.utils import llm_stream
+from app.utils.llm_stream import astream_json
+
+
+class FakeChunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeStreamingLLM:
+    """Minimal chat model that streams fixed chunks"""
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.consumed = 0
+
+    async def astream(self, messages):
+        for part in self.parts:
+            self.consumed += 1
+            yield FakeChunk(part)
+
+
+class FlakyStreamingLLM(FakeStreamingLLM):
+    """Chat model that times out before succeeding"""
+
+    def __init__(self, parts, failures):
+        super().__init__(parts)
+        self.failures = failures
+        self.attempts = 0
+
+    async def astream(self, messages):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise asyncio.TimeoutError()
+        async for chunk in super().astream(messages):
+            yield chunk
+
+
+class TestAstreamJson:
+    """Test cases for astream_json"""
+
+    @pytest.mark.asyncio
+    async def test_returns_once_object_closes(self):
+        """Parsing happens as soon as the object balances, ignoring braces in strings"""
+        llm = FakeStreamingLLM(['```json\n{"a": "}{\\"', '", "b": {"c": [1]}}', "\n```", "trailing text"])
+
+        result = await astream_json(llm, [])
+
+        assert result == {"a": '}{"', "b": {"c": [1]}}
+        assert llm.consumed == 2
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_full_text(self):
+        """Responses without a balanced object are parsed after the stream ends"""
+        llm = FakeStreamingLLM(["```json\n", "[1, 2]", "\n```"])
+
+        assert await astream_json(llm, []) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, monkeypatch):
+        """Transient failures are retried before the response is parsed"""
+        monkeypatch.setattr(llm_stream, "_BACKOFF_BASE_SECONDS", 0.0)
+        llm = FlakyStreamingLLM(['{"ok": true}'], failures=2)
+
+        assert await astream_json(llm, []) == {"ok": True}
+        assert llm.attempts == 3
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_configured_retries(self, monkeypatch):
+        """Errors outlasting the configured retry budget are raised"""
+        monkeypatch.setattr(llm_stream, "_BACKOFF_BASE_SECONDS", 0.0)
+        monkeypatch.setattr(llm_stream, "_max_retries", llm_stream._max_retries)
+        monkeypatch.setattr(llm_stream, "_concurrent_limit", llm_stream._concurrent_limit)
+        monkeypatch.setattr(llm_stream, "_llm_semaphores", llm_stream.weakref.WeakKeyDictionary())
+        llm_stream.configure(max_retries=1, concurrent_limit=2)
+        llm = FlakyStreamingLLM(['{"ok": true}'], failures=2)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await astream_json(llm, [])
+        assert llm.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_returns_whole_top_level_array(self):
+        """A top-level array is returned whole, not just its first object"""
+        llm = FakeStreamingLLM(['```json\n[{"a": 1}', ', {"b": [2, "]"]}]', "\n```"])
+
+        assert await astream_json(llm, []) == [{"a": 1}, {"b": [2, "]"]}]
+
+    def test_semaphore_is_per_event_loop(self):
+        """Each event loop gets its own semaphore"""
+        async def get_semaphore():
+            return llm_stream._get_semaphore()
+
+        first = asyncio.run(get_semaphore())
+        second = asyncio.run(get_semaphore())
+
+        assert first is not second
+        assert asyncio.run(astream_json(FakeStreamingLLM(['{"ok": 1}']), [])) == {"ok": 1}
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from app.utils.semantic_cache import SemanticCache
+
+
+class FakeEmbeddingModel:
+    """Embedding model that counts encode calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, normalize_embeddings=True):
+        self.calls += 1
+        return unit(len(text), 1, 0)
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def cache():
+    """Create a small semantic cache for testing"""
+    return SemanticCache(threshold=0.9, maxsize=2)
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache"""
+
+    def test_similar_embedding_hits(self, cache):
+        """A close embedding returns the stored result, a distant one misses"""
+        cache.set(unit(1, 0, 0), {"document_type": "contract"})
+
+        assert cache.get(unit(1, 0.1, 0)) == {"document_type": "contract"}
+        assert cache.get(unit(0, 1, 0)) is None
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    def test_get_returns_copy(self, cache):
+        """Mutating a cached result does not change the stored entry"""
+        cache.set(unit(1, 0, 0), {"key_indicators": ["a"]})
+
+        cache.get(unit(1, 0, 0))["key_indicators"].append("b")
+
+        assert cache.get(unit(1, 0, 0)) == {"key_indicators": ["a"]}
+
+    def test_lru_slot_is_replaced(self, cache):
+        """The least recently used entry is overwritten at capacity"""
+        cache.set(unit(1, 0, 0), {"value": "a"})
+        cache.set(unit(0, 1, 0), {"value": "b"})
+        cache.get(unit(1, 0, 0))
+        cache.set(unit(0, 0, 1), {"value": "c"})
+
+        assert cache.get(unit(0, 1, 0)) is None
+        assert cache.get(unit(1, 0, 0)) == {"value": "a"}
+        assert len(cache) == 2
+
+    def test_clear_resets_recency(self, cache):
+        """After a clear, eviction order only reflects entries stored since"""
+        cache.set(unit(1, 0, 0), {"value": "a"})
+        cache.set(unit(0, 1, 0), {"value": "b"})
+        cache.get(unit(0, 1, 0))
+        cache.clear()
+
+        cache.set(unit(0, 0, 1), {"value": "c"})
+        cache.set(unit(1, 1, 0), {"value": "d"})
+        cache.set(unit(1, 0, 1), {"value": "e"})
+
+        assert cache.get(unit(1, 0, 0)) is None
+        assert cache.get(unit(0, 0, 1)) is None
+        assert cache.get(unit(1, 1, 0)) == {"value": "d"}
+        assert len(cache) == 2
+
+    def test_disabled_cache_is_a_no_op(self, cache):
+        """Without an embedding every lookup misses and nothing is stored"""
+        cache.set(None, {"value": "a"})
+
+        assert cache.get(None) is None
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_embed_memoizes_by_text(self, cache):
+        """Repeated texts reuse their embedding instead of re-running the model"""
+        model = FakeEmbeddingModel()
+        cache._model = model
+
+        first = await cache.embed("same text")
+        second = await cache.embed("same text")
+        await cache.embed("other text")
+
+        assert model.calls == 2
+        assert np.array_equal(first, second)
+        assert not first.flags.writeable
@@ -0,0 +1,67 @@
+import pytest
+
+from app.utils import tokens
+from app.utils.tokens import truncate_to_tokens
+
+
+class FakeEncoding:
+    """Encoding with one token per character"""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, token_list):
+        return "".join(token_list)
+
+
+class FlakyTiktoken:
+    """tiktoken stand-in whose first load fails"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.loads = 0
+
+    def encoding_for_model(self, model):
+        self.loads += 1
+        if self.loads <= self.failures:
+            raise ConnectionError("download failed")
+        return FakeEncoding()
+
+    def get_encoding(self, name):
+        return self.encoding_for_model(name)
+
+
+@pytest.fixture
+def fake_tiktoken(monkeypatch):
+    """Isolate the tokenizer registry and swap in a tiktoken that fails once"""
+    fake = FlakyTiktoken(failures=1)
+    monkeypatch.setattr(tokens, "tiktoken", fake)
+    monkeypatch.setattr(tokens, "_encodings", {})
+    monkeypatch.setattr(tokens, "_failed_at", {})
+    return fake
+
+
+class TestTruncateToTokens:
+    """Test cases for token-budget truncation"""
+
+    @pytest.mark.asyncio
+    async def test_failed_load_falls_back_and_is_retried(self, fake_tiktoken, monkeypatch):
+        """A failed load truncates by characters and is retried once the retry interval passes"""
+        assert await truncate_to_tokens("x" * 100, 10) == "x" * 10 * tokens._FALLBACK_CHARS_PER_TOKEN
+
+        # Within the retry interval the failure is not retried
+        assert await truncate_to_tokens("x" * 100, 10) == "x" * 10 * tokens._FALLBACK_CHARS_PER_TOKEN
+        assert fake_tiktoken.loads == 1
+
+        monkeypatch.setattr(tokens, "_LOAD_RETRY_SECONDS", 0.0)
+        assert await truncate_to_tokens("x" * 100, 10) == "x" * 10
+        assert fake_tiktoken.loads == 2
+
+    @pytest.mark.asyncio
+    async def test_loaded_encoding_is_reused(self, fake_tiktoken):
+        """Successful loads are kept"""
+        fake_tiktoken.failures = 0
+
+        assert await truncate_to_tokens("abc", 10) == "abc"
+        assert await truncate_to_tokens("abcdef", 2) == "ab"
+        assert fake_tiktoken.loads == 1